@@ -1,6 +1,7 @@
 # Modbus Diagnostics Tool - Configuration Constants
 # Lambda Heat Pumps Modbus Communication Diagnostics
 
+import functools
 import os
 from typing import Dict, List, Tuple
 
@@ -16,6 +17,10 @@ USE_SECONDARY_AS_PRIMARY = False
 # Options: 'fallback', 'alternating', 'both', 'primary_only', 'secondary_only'
 HOST_ACCESS_MODE = 'fallback'  # Test Python Simulator only
 
+# Read Coalescing Configuration
+# Registers closer together than MAX_GAP are merged into one read block
+MAX_GAP = 16
+
 # Primary Modbus Host (Real Lambda Heat Pump)
 PRIMARY_HOST = "192.168.178.125"
 PRIMARY_PORT = 502
@@ -121,38 +126,45 @@ def get_host_status():
         }
     }
 
-def get_host_access_mode():
-    """Get current host access mode with description."""
-    modes = {
-        'fallback': {
-            'description': 'Secondary (Python Simulator) wird nur bei Primary (Lambda WP) Fehlern verwendet',
-            'behavior': 'Primary (Real Lambda) first, Secondary (Simulator) only on failure'
-        },
-        'alternating': {
-            'description': 'Wechselt zwischen Primary (Lambda WP) und Secondary (Python Simulator) ab',
-            'behavior': 'Alternates between real Lambda and simulator each request'
-        },
-        'both': {
-            'description': 'Beide Hosts werden bei jedem Request getestet (Lambda WP + Python Simulator)',
-            'behavior': 'Tests both real Lambda and simulator on every request'
-        },
-        'primary_only': {
-            'description': 'Nur Primary Host (Real Lambda WP) wird verwendet',
-            'behavior': 'Only uses real Lambda heat pump'
-        },
-        'secondary_only': {
-            'description': 'Nur Secondary Host (Python Simulator) wird verwendet',
-            'behavior': 'Only uses Python Modbus simulator'
-        }
+# Static mode descriptions, built once at import
+_ACCESS_MODES = {
+    'fallback': {
+        'description': 'Secondary (Python Simulator) wird nur bei Primary (Lambda WP) Fehlern verwendet',
+        'behavior': 'Primary (Real Lambda) first, Secondary (Simulator) only on failure'
+    },
+    'alternating': {
+        'description': 'Wechselt zwischen Primary (Lambda WP) und Secondary (Python Simulator) ab',
+        'behavior': 'Alternates between real Lambda and simulator each request'
+    },
+    'both': {
+        'description': 'Beide Hosts werden bei jedem Request getestet (Lambda WP + Python Simulator)',
+        'behavior': 'Tests both real Lambda and simulator on every request'
+    },
+    'primary_only': {
+        'description': 'Nur Primary Host (Real Lambda WP) wird verwendet',
+        'behavior': 'Only uses real Lambda heat pump'
+    },
+    'secondary_only': {
+        'description': 'Nur Secondary Host (Python Simulator) wird verwendet',
+        'behavior': 'Only uses Python Modbus simulator'
     }
-    
+}
+
+@functools.lru_cache(maxsize=8)
+def _access_mode_info(mode):
+    """Build the info dict for a mode once; there are only five modes."""
+    info = _ACCESS_MODES.get(mode, {})
     return {
-        'current_mode': HOST_ACCESS_MODE,
-        'description': modes.get(HOST_ACCESS_MODE, {}).get('description', 'Unknown mode'),
-        'behavior': modes.get(HOST_ACCESS_MODE, {}).get('behavior', 'Unknown behavior'),
-        'available_modes': list(modes.keys())
+        'current_mode': mode,
+        'description': info.get('description', 'Unknown mode'),
+        'behavior': info.get('behavior', 'Unknown behavior'),
+        'available_modes': list(_ACCESS_MODES.keys())
     }
 
+def get_host_access_mode():
+    """Get current host access mode with description."""
+    return _access_mode_info(HOST_ACCESS_MODE)
+
 # =============================================================================
 # TIMING AND INTERVAL SETTINGS
 # =============================================================================
@@ -297,6 +309,10 @@ LOW_PRIORITY_SLOW_THRESHOLD = 5000
 DB_DIR = "data"
 DB_FILE = os.path.join(DB_DIR, "modbus_performance.db")
 
+# Retention settings (old performance_log rows are pruned periodically)
+DB_RETENTION_DAYS = 30
+DB_PRUNE_INTERVAL = 3600  # seconds between prune passes
+
 # Database tables
 TABLES = {
     'performance_log': '''
@@ -336,6 +352,14 @@ TABLES = {
     '''
 }
 
+# Database indexes (performance_log is queried ORDER BY / WHERE timestamp)
+INDEXES = {
+    'idx_perflog_ts_desc': '''
+        CREATE INDEX IF NOT EXISTS idx_perflog_ts_desc
+        ON performance_log(timestamp DESC)
+    '''
+}
+
 # =============================================================================
 # NETWORK DIAGNOSTICS SETTINGS
 # =============================================================================
@@ -343,6 +367,7 @@ TABLES = {
 # Ping test configuration
 PING_COUNT = 4
 PING_INTERVAL = 1.0
+PING_CACHE_TTL = 30.0  # seconds a ping result stays fresh
 
 # Port scan configuration
 PORT_SCAN_TIMEOUT = 2.0
@@ -5,13 +5,18 @@ Monitors Modbus registers with anti-synchronization and automatic fallback to se
 
 import time
 import random
+import socket
+import struct
 import threading
 import logging
+import operator
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Callable, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 import sqlite3
+import queue
 import json
 
 from pymodbus.client.sync import ModbusTcpClient
@@ -23,7 +28,8 @@ from const import (
     RANDOM_INTERVAL_RANGE, MIN_INTERVAL, MAX_INTERVAL,
     DEFAULT_TIMEOUT, MAX_RETRIES, RETRY_DELAY, EXPONENTIAL_BACKOFF,
     TIMEOUT_THRESHOLD, ERROR_RATE_THRESHOLD, FAILURE_THRESHOLD,
-    DB_FILE, TABLES, get_random_interval, get_timeout_for_register,
+    DB_FILE, TABLES, INDEXES, DB_RETENTION_DAYS, DB_PRUNE_INTERVAL, MAX_GAP,
+    get_random_interval, get_timeout_for_register,
     get_active_hosts, get_primary_host, get_secondary_host, get_host_status,
     HOST_ACCESS_MODE, get_host_access_mode,
     LAMBDA_UNIT_ID, LAMBDA_TIMEOUT, LAMBDA_CRITICAL_REGISTERS
@@ -31,7 +37,18 @@ from const import (
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Precompiled insert statement and row projection for _store_result
+_INSERT_RESULT_SQL = """
+    INSERT INTO performance_log
+    (timestamp, host, port, register, success, response_time, error_type, error_message)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_RESULT_ROW = operator.attrgetter(
+    'timestamp', 'host', 'port', 'register',
+    'success', 'response_time', 'error_type', 'error_message'
+)
+
+@dataclass(slots=True)
 class ModbusResult:
     """Result of a Modbus read operation."""
     timestamp: datetime
@@ -44,8 +61,9 @@ class ModbusResult:
     error_message: Optional[str] = None
     value: Optional[int] = None
     retry_count: int = 0
+    is_timeout: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class HostStatus:
     """Status information for a Modbus host."""
     host: str
@@ -54,14 +72,14 @@ class HostStatus:
     consecutive_failures: int = 0
     total_failures: int = 0
     total_successes: int = 0
-    last_success: Optional[datetime] = None
-    last_failure: Optional[datetime] = None
+    last_success_ts: float = 0.0  # time.monotonic() of last success
+    last_failure_ts: float = 0.0  # time.monotonic() of last failure
     avg_response_time: float = 0.0
     response_times: deque = field(default_factory=lambda: deque(maxlen=100))
     circuit_breaker_open: bool = False
-    circuit_breaker_until: Optional[datetime] = None
+    cb_until_mono: float = 0.0  # time.monotonic() when the breaker may close
 
-@dataclass
+@dataclass(slots=True)
 class MonitorConfig:
     """Configuration for the Modbus monitor."""
     primary_host: str = PRIMARY_HOST
@@ -81,6 +99,7 @@ class MonitorConfig:
     timeout_threshold: int = TIMEOUT_THRESHOLD
     error_rate_threshold: float = ERROR_RATE_THRESHOLD
     failure_threshold: int = FAILURE_THRESHOLD
+    retention_days: int = DB_RETENTION_DAYS
 
 class ModbusMonitor:
     """Modbus monitor with random distribution and fallback support."""
@@ -110,11 +129,45 @@ class ModbusMonitor:
             'fallback_switches': 0,
             'alternating_switches': 0,
             'both_host_tests': 0,
+            'dropped_rows': 0,
             'start_time': None
         }
-        
+        # Counter updates come from the monitor thread and the 'both'
+        # mode worker pair; the lock keeps increments and snapshots consistent
+        self._stats_lock = threading.Lock()
+        
+        # Access mode, switchable at runtime via set_mode(); reads go
+        # through a dispatch table instead of per-call string compares
+        self._dispatch = {
+            'fallback': self._perform_fallback_read,
+            'alternating': self._perform_alternating_read,
+            'both': self._perform_both_hosts_read,
+            'primary_only': lambda: self._read_from_host('primary'),
+            'secondary_only': lambda: self._read_from_host('secondary'),
+        }
+        self.access_mode = HOST_ACCESS_MODE
+        self._read_for_mode = self._dispatch.get(self.access_mode)
+
         # Alternating mode state
         self.alternating_counter = 0
+
+        # Worker pair for 'both' mode: primary and secondary reads run
+        # concurrently, so wall-clock is max() of the two, not the sum
+        self._both_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="both-read")
+
+        # Persistent Modbus clients, one per host: connected on first
+        # use and reused across reads, reconnected on failure
+        self._clients: Dict[Tuple[str, int], ModbusTcpClient] = {}
+        self._clients_lock = threading.Lock()
+
+        # Retention pruning state
+        self._last_prune_mono = 0.0
+
+        # Precomputed retry base delays (exponential backoff resolved at init)
+        self._base_delays = tuple(
+            self.config.retry_delay * (2 ** i) if self.config.exponential_backoff else self.config.retry_delay
+            for i in range(self.config.max_retries)
+        )
         
         # Callbacks
         self.callbacks = {
@@ -126,30 +179,36 @@ class ModbusMonitor:
         
         # Initialize database
         self._init_database()
+
+        # Background DB writer: the monitor loop only enqueues rows and
+        # never blocks on disk I/O.
+        self._write_queue = queue.Queue(maxsize=1000)
+        self._last_drop_warn_mono = 0.0
+        self._db_writer_thread = threading.Thread(target=self._db_writer_loop, daemon=True)
+        self._db_writer_thread.start()
         
         # Get host status for logging
         host_status = get_host_status()
         access_mode_info = get_host_access_mode()
         
-        logger.info(f"🔧 ModbusMonitor initialized")
-        logger.info(f"   Active Primary: {primary_host}:{primary_port} (original: {host_status['active_primary']['original_role']})")
-        logger.info(f"   Active Secondary: {secondary_host}:{secondary_port} (original: {host_status['active_secondary']['original_role']})")
-        logger.info(f"   Host Switch: {'ENABLED' if host_status['switch_enabled'] else 'DISABLED'}")
-        logger.info(f"   Access Mode: {HOST_ACCESS_MODE} - {access_mode_info['description']}")
-        logger.info(f"   Test Register: {self.config.test_register}")
-        logger.info(f"   Interval: {self.config.base_interval}s ± {self.config.random_range}s")
+        logger.info("🔧 ModbusMonitor initialized")
+        logger.info("   Active Primary: %s:%s (original: %s)",
+                    primary_host, primary_port, host_status['active_primary']['original_role'])
+        logger.info("   Active Secondary: %s:%s (original: %s)",
+                    secondary_host, secondary_port, host_status['active_secondary']['original_role'])
+        logger.info("   Host Switch: %s", 'ENABLED' if host_status['switch_enabled'] else 'DISABLED')
+        logger.info("   Access Mode: %s - %s", HOST_ACCESS_MODE, access_mode_info['description'])
+        logger.info("   Test Register: %s", self.config.test_register)
+        logger.info("   Interval: %ss ± %ss", self.config.base_interval, self.config.random_range)
     
     def _init_database(self):
         """Initialize SQLite database for storing results."""
         try:
             with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Create tables
-                for table_name, create_sql in TABLES.items():
-                    cursor.execute(create_sql)
-                
-                conn.commit()
+                # Run all DDL (tables + indexes) in a single script; every
+                # statement uses IF NOT EXISTS so this is idempotent.
+                schema = ";\n".join(list(TABLES.values()) + list(INDEXES.values())) + ";"
+                conn.executescript(schema)
                 logger.info(f"✅ Database initialized: {self.db_path}")
                 
         except Exception as e:
@@ -170,7 +229,8 @@ class ModbusMonitor:
         
         self.running = True
         self.stop_event.clear()
-        self.stats['start_time'] = datetime.now()
+        with self._stats_lock:
+            self.stats['start_time'] = datetime.now()
         
         self.monitor_thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self.monitor_thread.start()
@@ -188,57 +248,91 @@ class ModbusMonitor:
         
         if self.monitor_thread:
             self.monitor_thread.join(timeout=5)
-        
+
+        self._both_pool.shutdown(wait=False)
+        self._close_clients()
+
+        # Give the DB writer a moment to flush pending rows
+        deadline = time.monotonic() + 2.0
+        while not self._write_queue.empty() and time.monotonic() < deadline:
+            time.sleep(0.05)
+
+        # Let SQLite refresh its query planner statistics on shutdown
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute("PRAGMA optimize")
+        except Exception as e:
+            logger.debug(f"PRAGMA optimize failed: {e}")
+
         logger.info("🛑 Modbus monitoring stopped")
     
     def _monitor_loop(self):
         """Main monitoring loop with random intervals."""
         logger.info("🔄 Starting monitor loop with random intervals")
-        
+
+        # Bind hot lookups to locals so the loop body uses LOAD_FAST
+        # instead of global/attribute lookups on every iteration.
+        monotonic = time.monotonic
+        get_interval = get_random_interval
+        wait = self.stop_event.wait
+        perform_read = self._perform_modbus_read
+        process_result = self._process_result
+        update_statistics = self._update_statistics
+        store_result = self._store_result
+        trigger_callbacks = self._trigger_callbacks
+
         while self.running and not self.stop_event.is_set():
             try:
-                # Calculate next interval with random distribution
-                next_interval = get_random_interval()
-                
+                # Fix the next fire time up front so the wait accounts for
+                # however long the read and processing take (no drift).
+                next_fire = monotonic() + get_interval()
+
                 # Perform Modbus read
-                result = self._perform_modbus_read()
-                
+                result = perform_read()
+
                 # Process result
-                self._process_result(result)
-                
+                process_result(result)
+
                 # Update statistics
-                self._update_statistics(result)
-                
+                update_statistics(result)
+
                 # Store in database
-                self._store_result(result)
-                
+                store_result(result)
+
                 # Trigger callbacks
-                self._trigger_callbacks('on_result', result)
-                
+                trigger_callbacks('on_result', result)
+
                 # Wait for next interval
-                logger.debug(f"⏱️  Next read in {next_interval:.1f}s")
-                self.stop_event.wait(next_interval)
-                
+                remaining = max(0.0, next_fire - monotonic())
+                logger.debug(f"⏱️  Next read in {remaining:.1f}s")
+                wait(remaining)
+
             except Exception as e:
                 logger.error(f"❌ Error in monitor loop: {e}")
-                self._trigger_callbacks('on_error', e)
-                time.sleep(5)  # Wait before retrying
+                trigger_callbacks('on_error', e)
+                wait(5)  # Wait before retrying, wake on stop
     
+    def set_mode(self, mode: str):
+        """Switch the access mode without rebuilding monitor or connections."""
+        self.access_mode = mode
+        self._read_for_mode = self._dispatch.get(mode)
+        logger.info("🔀 Access mode set to %s", mode)
+
+    def close(self):
+        """Release background resources (writer flush, worker pool, clients)."""
+        if self.running:
+            self.stop_monitoring()
+        else:
+            self._both_pool.shutdown(wait=False)
+            self._close_clients()
+
     def _perform_modbus_read(self) -> ModbusResult:
         """Perform a Modbus read operation based on access mode."""
-        if HOST_ACCESS_MODE == 'fallback':
-            return self._perform_fallback_read()
-        elif HOST_ACCESS_MODE == 'alternating':
-            return self._perform_alternating_read()
-        elif HOST_ACCESS_MODE == 'both':
-            return self._perform_both_hosts_read()
-        elif HOST_ACCESS_MODE == 'primary_only':
-            return self._read_from_host('primary')
-        elif HOST_ACCESS_MODE == 'secondary_only':
-            return self._read_from_host('secondary')
-        else:
-            logger.warning(f"⚠️  Unknown access mode: {HOST_ACCESS_MODE}, using fallback")
-            return self._perform_fallback_read()
+        read = self._read_for_mode
+        if read is None:
+            logger.warning(f"⚠️  Unknown access mode: {self.access_mode}, using fallback")
+            read = self._perform_fallback_read
+        return read()
     
     def _perform_fallback_read(self) -> ModbusResult:
         """Perform fallback read: Primary first, Secondary only on failure."""
@@ -253,7 +347,8 @@ class ModbusMonitor:
         secondary_result = self._read_from_host('secondary')
         
         if secondary_result.success:
-            self.stats['fallback_switches'] += 1
+            with self._stats_lock:
+                self.stats['fallback_switches'] += 1
             self._trigger_callbacks('on_fallback', {
                 'from': 'primary',
                 'to': 'secondary',
@@ -290,7 +385,8 @@ class ModbusMonitor:
         fallback_result = self._read_from_host(other_host)
         
         if fallback_result.success:
-            self.stats['alternating_switches'] += 1
+            with self._stats_lock:
+                self.stats['alternating_switches'] += 1
             self._trigger_callbacks('on_fallback', {
                 'from': host_type,
                 'to': other_host,
@@ -304,29 +400,39 @@ class ModbusMonitor:
     
     def _perform_both_hosts_read(self) -> ModbusResult:
         """Perform read on both hosts and return the best result."""
-        self.stats['both_host_tests'] += 1
-        
-        # Test both hosts
-        primary_result = self._read_from_host('primary')
-        secondary_result = self._read_from_host('secondary')
-        
-        # Log both results in detail
-        logger.info(f"🔍 Both hosts test:")
-        logger.info(f"   Primary ({primary_result.host}:{primary_result.port}): {'✅' if primary_result.success else '❌'} - "
-                   f"{'Value: ' + str(primary_result.value) + ', ' if primary_result.success else ''}"
-                   f"{primary_result.response_time:.1f}ms")
-        logger.info(f"   Secondary ({secondary_result.host}:{secondary_result.port}): {'✅' if secondary_result.success else '❌'} - "
-                   f"{'Value: ' + str(secondary_result.value) + ', ' if secondary_result.success else ''}"
-                   f"{secondary_result.response_time:.1f}ms")
-        
+        with self._stats_lock:
+            self.stats['both_host_tests'] += 1
+        
+        # Test both hosts concurrently on the dedicated worker pair
+        primary_future = self._both_pool.submit(self._read_from_host, 'primary')
+        secondary_future = self._both_pool.submit(self._read_from_host, 'secondary')
+        primary_result = primary_future.result()
+        secondary_result = secondary_future.result()
+        
+        # Log both results in detail (only assemble strings when INFO is emitted)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔍 Both hosts test:")
+            logger.info("   Primary (%s:%s): %s - %s%.1fms",
+                        primary_result.host, primary_result.port,
+                        '✅' if primary_result.success else '❌',
+                        'Value: ' + str(primary_result.value) + ', ' if primary_result.success else '',
+                        primary_result.response_time)
+            logger.info("   Secondary (%s:%s): %s - %s%.1fms",
+                        secondary_result.host, secondary_result.port,
+                        '✅' if secondary_result.success else '❌',
+                        'Value: ' + str(secondary_result.value) + ', ' if secondary_result.success else '',
+                        secondary_result.response_time)
+
         # Return the best result
         if primary_result.success and secondary_result.success:
             # Both successful, return the faster one
             if primary_result.response_time <= secondary_result.response_time:
-                logger.info(f"   → Using Primary (faster: {primary_result.response_time:.1f}ms vs {secondary_result.response_time:.1f}ms)")
+                logger.info("   → Using Primary (faster: %.1fms vs %.1fms)",
+                            primary_result.response_time, secondary_result.response_time)
                 return primary_result
             else:
-                logger.info(f"   → Using Secondary (faster: {secondary_result.response_time:.1f}ms vs {primary_result.response_time:.1f}ms)")
+                logger.info("   → Using Secondary (faster: %.1fms vs %.1fms)",
+                            secondary_result.response_time, primary_result.response_time)
                 return secondary_result
         elif primary_result.success:
             return primary_result
@@ -338,13 +444,37 @@ class ModbusMonitor:
                         f"Secondary: {secondary_result.error_message}")
             return primary_result
     
+    @staticmethod
+    def plan_reads(addresses: List[int], max_gap: int = MAX_GAP,
+                   max_registers: int = 125) -> List[Tuple[int, int]]:
+        """Group register addresses into coalesced (start, count) blocks.
+
+        Nearby registers are merged into one block as long as the gap to
+        the previous address stays within max_gap and the block fits in a
+        single read request; the few wasted in-between registers are far
+        cheaper than extra round trips.
+        """
+        blocks = []
+        addrs = sorted(set(addresses))
+        if not addrs:
+            return blocks
+
+        start = prev = addrs[0]
+        for addr in addrs[1:]:
+            if addr - prev > max_gap or addr - start >= max_registers:
+                blocks.append((start, prev - start + 1))
+                start = addr
+            prev = addr
+        blocks.append((start, prev - start + 1))
+        return blocks
+
     def _read_from_host(self, host_type: str) -> ModbusResult:
         """Read from a specific host with retry logic."""
         host_status = self.host_status[host_type]
         
-        # Check circuit breaker
+        # Check circuit breaker (single float compare on the hot path)
         if host_status.circuit_breaker_open:
-            if host_status.circuit_breaker_until and datetime.now() < host_status.circuit_breaker_until:
+            if time.monotonic() < host_status.cb_until_mono:
                 return ModbusResult(
                     timestamp=datetime.now(),
                     host=host_status.host,
@@ -357,7 +487,7 @@ class ModbusMonitor:
             else:
                 # Circuit breaker timeout expired, reset
                 host_status.circuit_breaker_open = False
-                host_status.circuit_breaker_until = None
+                host_status.cb_until_mono = 0.0
                 logger.info(f"🔄 Circuit breaker reset for {host_type} host")
         
         # Perform read with retries
@@ -369,10 +499,9 @@ class ModbusMonitor:
                 self._update_host_status_success(host_status, result.response_time)
                 return result
             
-            # Wait before retry (exponential backoff)
+            # Wait before retry (full jitter over precomputed backoff base)
             if attempt < self.config.max_retries:
-                delay = self.config.retry_delay * (2 ** attempt) if self.config.exponential_backoff else self.config.retry_delay
-                delay += random.uniform(0, delay * 0.2)  # Add jitter
+                delay = self._base_delays[attempt] * random.random()
                 logger.debug(f"⏳ Retry {attempt + 1}/{self.config.max_retries} in {delay:.1f}s")
                 time.sleep(delay)
         
@@ -380,18 +509,120 @@ class ModbusMonitor:
         self._update_host_status_failure(host_status, result.error_message)
         return result
     
+    def modbus_ping(self, host_type: str = 'primary', timeout: float = 3.0) -> bool:
+        """Lightweight Modbus-level liveness probe.
+
+        Sends a minimal Report Server ID request (function code 0x11)
+        over a raw socket. Any well-formed reply - including a Modbus
+        exception response - proves the Modbus stack answers, which
+        distinguishes "TCP up but Modbus down" from a healthy endpoint
+        without touching register semantics.
+        """
+        host_status = self.host_status[host_type]
+        try:
+            with socket.create_connection((host_status.host, host_status.port),
+                                          timeout=timeout) as sock:
+                # One-shot socket: keepalive tuning would never fire
+                # within its lifetime, only Nagle matters here
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                # MBAP header (txid, protocol, length, unit) + bare PDU
+                sock.sendall(struct.pack('>HHHBB', 1, 0, 2, LAMBDA_UNIT_ID, 0x11))
+
+                header = b''
+                while len(header) < 7:
+                    chunk = sock.recv(7 - len(header))
+                    if not chunk:
+                        return False
+                    header += chunk
+
+                # Drain the advertised body so the peer sees a clean close
+                remaining = struct.unpack('>HHH', header[:6])[2] - 1
+                while remaining > 0:
+                    chunk = sock.recv(remaining)
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                return True
+        except OSError:
+            return False
+
+    @staticmethod
+    def _tune_socket(sock):
+        """Apply keepalive and latency options to a persistent socket.
+
+        Meant for the long-lived per-host clients: aggressive keepalive
+        probes detect half-open connections within a few seconds, and
+        TCP_NODELAY stops Nagle from delaying the tiny Modbus frames.
+        Platform-specific knobs are skipped where absent.
+        """
+        if sock is None:
+            return
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 1)
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 1)
+            if hasattr(socket, 'TCP_KEEPCNT'):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3)
+        except OSError as e:
+            logger.debug(f"Socket tuning skipped: {e}")
+
+    def _get_client(self, host_status: HostStatus) -> ModbusTcpClient:
+        """Return the persistent client for the host, reconnecting if needed.
+
+        Each host is read by at most one thread at a time (the monitor
+        loop, or its dedicated 'both'-mode worker), so the lock only
+        guards the dict, not client use.
+        """
+        key = (host_status.host, host_status.port)
+        with self._clients_lock:
+            client = self._clients.get(key)
+        if client is not None and client.is_socket_open():
+            return client
+
+        if client is not None:
+            client.close()
+        client = ModbusTcpClient(host_status.host, port=host_status.port)
+        if not client.connect():
+            raise ConnectionException(f"Failed to connect to {host_status.host}:{host_status.port}")
+        self._tune_socket(getattr(client, 'socket', None))
+        with self._clients_lock:
+            self._clients[key] = client
+        return client
+
+    def _drop_client(self, host_status: HostStatus):
+        """Close and forget the cached client so the next read reconnects."""
+        with self._clients_lock:
+            client = self._clients.pop((host_status.host, host_status.port), None)
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Closing failed client raised: {e}")
+
+    def _close_clients(self):
+        """Close all persistent clients."""
+        with self._clients_lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Closing client raised: {e}")
+
     def _single_read_attempt(self, host_status: HostStatus, attempt: int) -> ModbusResult:
         """Perform a single Modbus read attempt."""
-        start_time = time.time()
-        
+        # perf_counter_ns gives the highest-resolution monotonic clock,
+        # so response times stay meaningful at sub-millisecond scale
+        start_ns = time.perf_counter_ns()
+
         try:
-            # Create Modbus client (simplified like in client_gui.py but with configurable port)
-            client = ModbusTcpClient(host_status.host, port=host_status.port)
-            
-            # Connect
-            if not client.connect():
-                raise ConnectionException(f"Failed to connect to {host_status.host}:{host_status.port}")
-            
+            # Reuse the persistent per-host connection instead of paying
+            # a TCP handshake on every read
+            client = self._get_client(host_status)
+
             # Read register
             result = client.read_holding_registers(
                 address=self.config.test_register,
@@ -403,13 +634,11 @@ class ModbusMonitor:
                 raise ModbusException(f"Modbus error: {result}")
             
             # Calculate response time
-            response_time = (time.time() - start_time) * 1000  # Convert to milliseconds
+            response_time = (time.perf_counter_ns() - start_ns) / 1e6  # Convert to milliseconds
             
             # Extract value
             value = result.registers[0] if result.registers else None
-            
-            client.close()
-            
+
             return ModbusResult(
                 timestamp=datetime.now(),
                 host=host_status.host,
@@ -422,8 +651,19 @@ class ModbusMonitor:
             )
             
         except Exception as e:
-            response_time = (time.time() - start_time) * 1000
-            
+            response_time = (time.perf_counter_ns() - start_ns) / 1e6
+
+            # Drop the cached client; the next attempt reconnects fresh
+            self._drop_client(host_status)
+
+            # Classify timeouts once here instead of re-scanning the message
+            # on every statistics update.
+            is_timeout = (
+                isinstance(e, TimeoutError)
+                or 'timeout' in type(e).__name__.lower()
+                or 'timeout' in str(e).lower()
+            )
+
             return ModbusResult(
                 timestamp=datetime.now(),
                 host=host_status.host,
@@ -433,7 +673,8 @@ class ModbusMonitor:
                 response_time=response_time,
                 error_type=type(e).__name__,
                 error_message=str(e),
-                retry_count=attempt
+                retry_count=attempt,
+                is_timeout=is_timeout
             )
     
     def _update_host_status_success(self, host_status: HostStatus, response_time: float):
@@ -441,7 +682,7 @@ class ModbusMonitor:
         host_status.is_available = True
         host_status.consecutive_failures = 0
         host_status.total_successes += 1
-        host_status.last_success = datetime.now()
+        host_status.last_success_ts = time.monotonic()
         
         # Update response time statistics
         host_status.response_times.append(response_time)
@@ -450,20 +691,20 @@ class ModbusMonitor:
         # Reset circuit breaker if it was open
         if host_status.circuit_breaker_open:
             host_status.circuit_breaker_open = False
-            host_status.circuit_breaker_until = None
+            host_status.cb_until_mono = 0.0
             logger.info(f"✅ Circuit breaker closed for {host_status.host}")
     
     def _update_host_status_failure(self, host_status: HostStatus, error_message: str):
         """Update host status after failed read."""
         host_status.consecutive_failures += 1
         host_status.total_failures += 1
-        host_status.last_failure = datetime.now()
+        host_status.last_failure_ts = time.monotonic()
         
         # Check if circuit breaker should open
         if host_status.consecutive_failures >= self.config.failure_threshold:
             if not host_status.circuit_breaker_open:
                 host_status.circuit_breaker_open = True
-                host_status.circuit_breaker_until = datetime.now() + timedelta(seconds=60)
+                host_status.cb_until_mono = time.monotonic() + 60.0
                 logger.warning(f"🔴 Circuit breaker opened for {host_status.host} after {host_status.consecutive_failures} failures")
                 self._trigger_callbacks('on_circuit_breaker', {
                     'host': host_status.host,
@@ -474,50 +715,89 @@ class ModbusMonitor:
     def _process_result(self, result: ModbusResult):
         """Process and log the result."""
         if result.success:
-            logger.info(f"✅ {result.host}:{result.port} - Register {result.register} = {result.value} "
-                       f"({result.response_time:.1f}ms, retry {result.retry_count})")
+            logger.info("✅ %s:%s - Register %s = %s (%.1fms, retry %s)",
+                        result.host, result.port, result.register, result.value,
+                        result.response_time, result.retry_count)
         else:
-            logger.error(f"❌ {result.host}:{result.port} - Register {result.register} failed: "
-                        f"{result.error_type}: {result.error_message} "
-                        f"({result.response_time:.1f}ms, retry {result.retry_count})")
+            logger.error("❌ %s:%s - Register %s failed: %s: %s (%.1fms, retry %s)",
+                         result.host, result.port, result.register,
+                         result.error_type, result.error_message,
+                         result.response_time, result.retry_count)
     
     def _update_statistics(self, result: ModbusResult):
-        """Update monitoring statistics."""
-        self.stats['total_requests'] += 1
-        
-        if result.success:
-            self.stats['successful_requests'] += 1
-        else:
-            self.stats['failed_requests'] += 1
-            
-            if result.error_type == "TimeoutError" or "timeout" in str(result.error_message).lower():
-                self.stats['timeout_requests'] += 1
+        """Update monitoring statistics (O(1) streaming counters)."""
+        with self._stats_lock:
+            self.stats['total_requests'] += 1
+
+            if result.success:
+                self.stats['successful_requests'] += 1
+            else:
+                self.stats['failed_requests'] += 1
+
+                if result.is_timeout:
+                    self.stats['timeout_requests'] += 1
     
     def _store_result(self, result: ModbusResult):
-        """Store result in database."""
+        """Queue result for the background DB writer (never blocks)."""
+        row = _RESULT_ROW(result)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO performance_log 
-                    (timestamp, host, port, register, success, response_time, error_type, error_message)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    result.timestamp,
-                    result.host,
-                    result.port,
-                    result.register,
-                    result.success,
-                    result.response_time,
-                    result.error_type,
-                    result.error_message
-                ))
-                
-                conn.commit()
-                
-        except Exception as e:
-            logger.error(f"❌ Failed to store result in database: {e}")
+            self._write_queue.put_nowait(row)
+        except queue.Full:
+            # Writer is stalled - evict the oldest row so recent samples win
+            try:
+                self._write_queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self._write_queue.put_nowait(row)
+            except queue.Full:
+                pass
+            with self._stats_lock:
+                self.stats['dropped_rows'] += 1
+                dropped = self.stats['dropped_rows']
+            now = time.monotonic()
+            if now - self._last_drop_warn_mono > 60:
+                self._last_drop_warn_mono = now
+                logger.warning("⚠️  DB write queue full - dropping oldest rows (%s dropped so far)",
+                               dropped)
+
+    def _db_writer_loop(self):
+        """Background thread draining the write queue into SQLite."""
+        while True:
+            try:
+                rows = [self._write_queue.get(timeout=1.0)]
+            except queue.Empty:
+                continue
+
+            # Drain whatever else is pending so one transaction covers it
+            while True:
+                try:
+                    rows.append(self._write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            try:
+                with sqlite3.connect(self.db_path) as conn:
+                    conn.executemany(_INSERT_RESULT_SQL, rows)
+                    conn.commit()
+
+                    # Prune old rows periodically to keep the table bounded
+                    if time.monotonic() - self._last_prune_mono > DB_PRUNE_INTERVAL:
+                        self._prune_old_results(conn)
+
+            except Exception as e:
+                logger.error(f"❌ Failed to store results in database: {e}")
+
+    def _prune_old_results(self, conn: sqlite3.Connection):
+        """Delete performance_log rows older than the retention window."""
+        cutoff = datetime.now() - timedelta(days=self.config.retention_days)
+        deleted = conn.execute(
+            "DELETE FROM performance_log WHERE timestamp < ?", (cutoff,)
+        ).rowcount
+        conn.commit()
+        self._last_prune_mono = time.monotonic()
+        if deleted:
+            logger.info(f"🧹 Pruned {deleted} performance_log rows older than {self.config.retention_days} days")
     
     def _trigger_callbacks(self, event_type: str, data):
         """Trigger callbacks for specific events."""
@@ -529,19 +809,23 @@ class ModbusMonitor:
     
     def get_statistics(self) -> Dict:
         """Get current monitoring statistics."""
-        uptime = datetime.now() - self.stats['start_time'] if self.stats['start_time'] else timedelta(0)
-        
+        with self._stats_lock:
+            stats = dict(self.stats)
+
+        uptime = datetime.now() - stats['start_time'] if stats['start_time'] else timedelta(0)
+
         return {
             'uptime_seconds': uptime.total_seconds(),
-            'total_requests': self.stats['total_requests'],
-            'successful_requests': self.stats['successful_requests'],
-            'failed_requests': self.stats['failed_requests'],
-            'timeout_requests': self.stats['timeout_requests'],
-            'fallback_switches': self.stats['fallback_switches'],
-            'alternating_switches': self.stats['alternating_switches'],
-            'both_host_tests': self.stats['both_host_tests'],
-            'success_rate': (self.stats['successful_requests'] / max(1, self.stats['total_requests'])) * 100,
-            'access_mode': HOST_ACCESS_MODE,
+            'total_requests': stats['total_requests'],
+            'successful_requests': stats['successful_requests'],
+            'failed_requests': stats['failed_requests'],
+            'timeout_requests': stats['timeout_requests'],
+            'fallback_switches': stats['fallback_switches'],
+            'alternating_switches': stats['alternating_switches'],
+            'both_host_tests': stats['both_host_tests'],
+            'dropped_rows': stats['dropped_rows'],
+            'success_rate': (stats['successful_requests'] / max(1, stats['total_requests'])) * 100,
+            'access_mode': self.access_mode,
             'host_status': {
                 'primary': {
                     'host': self.host_status['primary'].host,
@@ -0,0 +1,190 @@
+"""
+Pipelined Modbus TCP Client with Transaction-ID Matching
+Keeps several read requests in flight on one connection instead of stop-and-wait.
+"""
+
+import asyncio
+import logging
+import socket
+import struct
+import threading
+from concurrent.futures import Future
+from typing import Dict, List
+
+from const import DEFAULT_TIMEOUT, LAMBDA_UNIT_ID
+
+logger = logging.getLogger(__name__)
+
+class PipelinedModbusClient:
+    """Modbus TCP client that pipelines read requests.
+
+    Modbus TCP correlates replies with requests via the MBAP transaction
+    identifier, so multiple requests may be outstanding on a single
+    connection. read_holding_registers() writes the request immediately
+    and returns a Future; a background reader thread parses incoming
+    frames and resolves the Future matching each transaction id. On a
+    high-latency link this turns N sequential round trips into roughly
+    one.
+    """
+
+    # Precompiled frame formats, shared across instances
+    # MBAP header: transaction id, protocol id, length, unit id
+    _MBAP_HEADER = struct.Struct('>HHHB')
+    # Function code 0x03 request body: function code, start address, count
+    _READ_HOLDING_REQUEST = struct.Struct('>BHH')
+
+    # Largest possible Modbus TCP ADU
+    _MAX_ADU = 260
+
+    def __init__(self, host: str, port: int, timeout: float = DEFAULT_TIMEOUT,
+                 unit_id: int = LAMBDA_UNIT_ID, max_pending: int = 8):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.unit_id = unit_id
+
+        self._sock = None
+        self._reader_thread = None
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._next_txid = 0
+        # Bounds in-flight requests (the maxPendingRequests knob)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        # Reusable receive buffer; only the reader thread touches it
+        self._rx_buf = bytearray(self._MAX_ADU)
+
+    def connect(self) -> bool:
+        """Open the connection and start the reply reader."""
+        try:
+            self._sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            self._reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+            self._reader_thread.start()
+            logger.debug("Pipelined client connected to %s:%s", self.host, self.port)
+            return True
+        except OSError as e:
+            logger.error(f"❌ Failed to connect to {self.host}:{self.port}: {e}")
+            self._sock = None
+            return False
+
+    def close(self):
+        """Close the connection and fail any still-pending requests."""
+        sock = self._sock
+        self._sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._fail_pending(ConnectionError("connection closed"))
+
+    def read_holding_registers(self, address: int, count: int = 1) -> 'Future[List[int]]':
+        """Submit a function-code 0x03 read; returns a Future of the values.
+
+        Blocks only when max_pending requests are already in flight.
+        """
+        if self._sock is None:
+            raise ConnectionError("not connected")
+
+        self._slots.acquire()
+        future = Future()
+        with self._lock:
+            self._next_txid = (self._next_txid + 1) & 0xFFFF
+            txid = self._next_txid
+            self._pending[txid] = future
+
+        # Length field covers unit id + PDU (1 + 5 bytes for this request)
+        frame = self._MBAP_HEADER.pack(txid, 0, 6, self.unit_id) + \
+            self._READ_HOLDING_REQUEST.pack(0x03, address, count)
+        try:
+            self._sock.sendall(frame)
+        except OSError as e:
+            with self._lock:
+                self._pending.pop(txid, None)
+            self._slots.release()
+            future.set_exception(e)
+        return future
+
+    def read_holding_registers_async(self, address: int, count: int = 1):
+        """Awaitable variant of read_holding_registers.
+
+        Lets callers on an asyncio loop gather many in-flight reads:
+        ``await asyncio.gather(*(c.read_holding_registers_async(a) for a in addrs))``
+        """
+        return asyncio.wrap_future(self.read_holding_registers(address, count))
+
+    def _reader_loop(self):
+        """Read reply frames and resolve the matching pending futures."""
+        mbap = self._MBAP_HEADER
+        try:
+            while self._sock is not None:
+                txid, protocol_id, length, unit_id = mbap.unpack(self._recv_exact(mbap.size))
+                # A reply PDU is at least function code + one byte; a
+                # length outside the ADU bound means the stream framing
+                # is lost and the connection cannot be trusted anymore
+                if length < 2 or length - 1 > len(self._rx_buf):
+                    raise ConnectionError(f"malformed MBAP length {length}")
+                pdu = self._recv_exact(length - 1)
+                self._dispatch(txid, pdu)
+        except (OSError, ConnectionError) as e:
+            if self._sock is not None:
+                logger.error(f"❌ Pipelined reader failed: {e}")
+            self._fail_pending(e)
+            self.close()
+
+    def _recv_exact(self, size: int) -> memoryview:
+        """Receive exactly size bytes into the reusable buffer.
+
+        recv_into a memoryview avoids a transient bytes object per
+        chunk; the returned view is valid until the next call.
+        """
+        view = memoryview(self._rx_buf)
+        received = 0
+        while received < size:
+            n = self._sock.recv_into(view[received:size])
+            if not n:
+                raise ConnectionError("connection closed by peer")
+            received += n
+        return view[:size]
+
+    def _dispatch(self, txid: int, pdu: bytes):
+        """Resolve the future registered for txid from a reply PDU."""
+        with self._lock:
+            future = self._pending.pop(txid, None)
+        if future is None:
+            logger.warning("⚠️  Reply for unknown transaction %s dropped", txid)
+            return
+        self._slots.release()
+
+        function_code = pdu[0]
+        if len(pdu) < 2:
+            future.set_exception(IOError("truncated reply PDU"))
+            raise ConnectionError(f"truncated reply for transaction {txid}")
+        if function_code & 0x80:
+            future.set_exception(IOError(f"Modbus exception code {pdu[1]}"))
+            return
+
+        # byte_count the peer claims must fit inside the PDU we framed,
+        # otherwise unpack would raise and kill the reader thread
+        byte_count = pdu[1]
+        if byte_count % 2 or byte_count > len(pdu) - 2:
+            future.set_exception(IOError(f"malformed reply byte count {byte_count}"))
+            raise ConnectionError(f"malformed reply for transaction {txid}")
+        values = list(struct.unpack(f'>{byte_count // 2}H', pdu[2:2 + byte_count]))
+        future.set_result(values)
+
+    def _fail_pending(self, error: Exception):
+        """Fail every outstanding request with the given error."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+            self._slots.release()
+
+    def __enter__(self):
+        if not self.connect():
+            raise ConnectionError(f"could not connect to {self.host}:{self.port}")
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
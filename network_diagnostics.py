@@ -3,6 +3,11 @@ Network Diagnostics for Modbus Communication
 Performs comprehensive network tests including ping, port scans, and connectivity tests.
 """
 
+import asyncio
+import errno
+import os
+import re
+import selectors
 import subprocess
 import socket
 import time
@@ -16,9 +21,17 @@ import logging
 from pymodbus.client.sync import ModbusTcpClient
 from pymodbus.exceptions import ModbusException, ConnectionException
 
+# icmplib support (optional): pings via a socket instead of forking the
+# ping binary and parsing its locale-dependent output
+try:
+    from icmplib import ping as icmp_ping
+    ICMPLIB_AVAILABLE = True
+except ImportError:
+    ICMPLIB_AVAILABLE = False
+
 from const import (
     PRIMARY_HOST, PRIMARY_PORT, SECONDARY_HOST, SECONDARY_PORT,
-    NETWORK_TEST_TARGETS, PING_COUNT, PING_INTERVAL, PING_TIMEOUT,
+    NETWORK_TEST_TARGETS, PING_COUNT, PING_INTERVAL, PING_TIMEOUT, PING_CACHE_TTL,
     PORT_SCAN_TIMEOUT, COMMON_MODBUS_PORTS, HIGH_LATENCY_THRESHOLD,
     PING_LOSS_THRESHOLD, DEFAULT_TIMEOUT,
     get_active_hosts, get_primary_host, get_secondary_host, get_host_status
@@ -26,7 +39,39 @@ from const import (
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Hashed lookup for "is this a Modbus port" checks in the analysis passes
+_MODBUS_PORT_SET = frozenset(COMMON_MODBUS_PORTS)
+
+# ASCII status markers for exported reports (plain text, safe for any
+# viewer or encoding the report file ends up in)
+_OK = "[OK]"
+_FAIL = "[FAIL]"
+_TIP = "*"
+
+# Platform-specific ping flags, resolved once at import
+_PING_COUNT_FLAG = '-n' if os.name == 'nt' else '-c'
+_PING_TIMEOUT_FLAG = '-w' if os.name == 'nt' else '-W'
+_PING_COUNT_STR = str(PING_COUNT)
+_PING_TIMEOUT_MS_STR = str(int(PING_TIMEOUT * 1000))  # timeout in ms
+# Fixed command prefix; only the target varies per call
+_PING_CMD_PREFIX = (
+    'ping',
+    _PING_COUNT_FLAG, _PING_COUNT_STR,
+    _PING_TIMEOUT_FLAG, _PING_TIMEOUT_MS_STR,
+)
+
+# Precompiled ping output patterns (English and German formats), applied
+# once against the raw stdout bytes - no text decode on the hot path
+_PING_STATS_RE = re.compile(
+    rb'(\d+)\s+(?:packets transmitted|pakete gesendet)[^,]*,\s*(\d+)\s+[^,]+,\s*([\d.]+)%',
+    re.IGNORECASE
+)
+_PING_TIMING_RE = re.compile(
+    rb'(?:min/avg/max|minimum/maximum/durchschnitt)[^=]*=\s*([\d.]+)/([\d.]+)/([\d.]+)',
+    re.IGNORECASE
+)
+
+@dataclass(slots=True, frozen=True)
 class PingResult:
     """Result of a ping test."""
     target: str
@@ -39,7 +84,7 @@ class PingResult:
     avg_time: Optional[float] = None
     error_message: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PortScanResult:
     """Result of a port scan."""
     host: str
@@ -48,7 +93,7 @@ class PortScanResult:
     response_time: Optional[float] = None
     error_message: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ModbusConnectivityResult:
     """Result of Modbus connectivity test."""
     host: str
@@ -60,7 +105,7 @@ class ModbusConnectivityResult:
     error_type: Optional[str] = None
     error_message: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True)
 class NetworkDiagnosticsResult:
     """Complete network diagnostics result."""
     timestamp: datetime
@@ -74,16 +119,28 @@ class NetworkDiagnosticsResult:
 class NetworkDiagnostics:
     """Comprehensive network diagnostics for Modbus communication."""
     
-    def __init__(self):
-        self.test_targets = NETWORK_TEST_TARGETS
-        
+    def __init__(self, concurrent_tasks: int = 256):
+        # Upper bound for simultaneously open sockets in the async scans
+        self.concurrent_tasks = concurrent_tasks
+
+        # Dedupe while keeping configured order, so duplicate entries
+        # (e.g. both Modbus hosts on one box) are only tested once
+        self.test_targets = list(dict.fromkeys(NETWORK_TEST_TARGETS))
+
         # Get active hosts based on switch setting
         primary_host, primary_port, secondary_host, secondary_port = get_active_hosts()
-        self.modbus_hosts = [
+        self.modbus_hosts = list(dict.fromkeys([
             (primary_host, primary_port),
             (secondary_host, secondary_port)
-        ]
+        ]))
         self.test_registers = [0, 1000, 1001, 1002, 1003, 1004]  # Various registers to test
+
+        # Ping results stay valid for a short TTL; entries are evicted
+        # lazily at lookup time, never via a full sweep
+        self._ping_cache: Dict[str, Tuple[float, PingResult]] = {}
+
+        # Long-lived worker pool shared across diagnostics runs
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="netdiag")
         
         # Get host status for logging
         host_status = get_host_status()
@@ -96,89 +153,141 @@ class NetworkDiagnostics:
             logger.info(f"   Primary: {primary_host}:{primary_port} (was secondary)")
             logger.info(f"   Secondary: {secondary_host}:{secondary_port} (was primary)")
     
-    def run_comprehensive_diagnostics(self) -> NetworkDiagnosticsResult:
-        """Run comprehensive network diagnostics."""
+    def close(self):
+        """Shut down the shared worker pool."""
+        self._pool.shutdown(wait=False)
+
+    @staticmethod
+    def _safe(fn, *args):
+        """Run fn(*args) and pack (args, result, error) for uniform collection."""
+        try:
+            return args, fn(*args), None
+        except Exception as e:
+            return args, None, e
+
+    def run_comprehensive_diagnostics(self, early_exit_score: Optional[float] = None) -> NetworkDiagnosticsResult:
+        """Run comprehensive network diagnostics.
+
+        If early_exit_score is given, results are scored incrementally as
+        they stream in; once the running health estimate drops below the
+        threshold, not-yet-started tests are cancelled and the (partial)
+        result is returned immediately.
+        """
         logger.info("🚀 Starting comprehensive network diagnostics")
         start_time = time.time()
         
-        # Run all tests in parallel
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # Submit ping tests
-            ping_futures = {
-                executor.submit(self._ping_host, target): target 
-                for target in self.test_targets
-            }
-            
-            # Submit port scans
-            port_scan_futures = {}
-            for host, port in self.modbus_hosts:
-                for modbus_port in COMMON_MODBUS_PORTS:
-                    future = executor.submit(self._scan_port, host, modbus_port)
-                    port_scan_futures[future] = (host, modbus_port)
-            
-            # Submit Modbus connectivity tests
-            modbus_futures = {}
-            for host, port in self.modbus_hosts:
-                for register in self.test_registers:
-                    future = executor.submit(self._test_modbus_connectivity, host, port, register)
-                    modbus_futures[future] = (host, port, register)
-            
-            # Collect results
-            ping_results = []
-            for future in as_completed(ping_futures):
-                try:
-                    result = future.result()
-                    ping_results.append(result)
-                except Exception as e:
-                    target = ping_futures[future]
-                    logger.error(f"❌ Ping test failed for {target}: {e}")
-                    ping_results.append(PingResult(
-                        target=target,
-                        success=False,
-                        packets_sent=0,
-                        packets_received=0,
-                        packet_loss=100.0,
-                        error_message=str(e)
-                    ))
-            
-            port_scan_results = []
-            for future in as_completed(port_scan_futures):
-                try:
-                    result = future.result()
-                    port_scan_results.append(result)
-                except Exception as e:
-                    host, port = port_scan_futures[future]
-                    logger.error(f"❌ Port scan failed for {host}:{port}: {e}")
-                    port_scan_results.append(PortScanResult(
-                        host=host,
-                        port=port,
-                        is_open=False,
-                        error_message=str(e)
-                    ))
-            
-            modbus_results = []
-            for future in as_completed(modbus_futures):
-                try:
-                    result = future.result()
-                    modbus_results.append(result)
-                except Exception as e:
-                    host, port, register = modbus_futures[future]
-                    logger.error(f"❌ Modbus test failed for {host}:{port} register {register}: {e}")
-                    modbus_results.append(ModbusConnectivityResult(
+        # Run all tests in parallel on the shared pool
+        executor = self._pool
+        # Submit ping tests; each task carries its own context so no
+        # future-to-context dict is needed
+        ping_futures = [
+            executor.submit(self._safe, self._ping_host, target)
+            for target in self.test_targets
+        ]
+        
+        # Submit port scans: all probes fly in parallel on one event
+        # loop instead of being rationed through the thread pool
+        port_pairs = [
+            (host, modbus_port)
+            for host, port in self.modbus_hosts
+            for modbus_port in COMMON_MODBUS_PORTS
+        ]
+        port_scan_future = executor.submit(asyncio.run, self._scan_ports_async(port_pairs))
+        
+        # Submit Modbus connectivity tests: one task per host reusing a
+        # single connection for all of that host's registers
+        modbus_futures = [
+            executor.submit(self._safe, self._test_modbus_host, host, port)
+            for host, port in self.modbus_hosts
+        ]
+        
+        # Collect results as they complete, keeping a running penalty so a
+        # hopeless network can be detected before every test has finished
+        penalty = 0.0
+        aborted = False
+
+        def _breached() -> bool:
+            return early_exit_score is not None and 100.0 - penalty < early_exit_score
+
+        ping_results = []
+        for future in as_completed(ping_futures):
+            (target,), result, error = future.result()
+            if error is None:
+                ping_results.append(result)
+            else:
+                logger.error(f"❌ Ping test failed for {target}: {error}")
+                result = PingResult(
+                    target=target,
+                    success=False,
+                    packets_sent=0,
+                    packets_received=0,
+                    packet_loss=100.0,
+                    error_message=str(error)
+                )
+                ping_results.append(result)
+            # Same host-level weights as _calculate_network_health_score
+            if not result.success:
+                penalty += 20
+            elif result.packet_loss > PING_LOSS_THRESHOLD * 100:
+                penalty += 10
+            elif result.avg_time and result.avg_time > HIGH_LATENCY_THRESHOLD:
+                penalty += 5
+            if _breached():
+                aborted = True
+                break
+
+        if aborted:
+            for future in ping_futures + modbus_futures:
+                future.cancel()
+            port_scan_future.cancel()
+
+        try:
+            port_scan_results = [] if aborted else port_scan_future.result()
+        except Exception as e:
+            logger.error(f"❌ Port scan failed: {e}")
+            port_scan_results = [
+                PortScanResult(host=host, port=port, is_open=False, error_message=str(e))
+                for host, port in port_pairs
+            ]
+
+        modbus_results = []
+        for future in as_completed(modbus_futures):
+            if aborted:
+                break
+            (host, port), result, error = future.result()
+            if error is None:
+                modbus_results.extend(result)
+            else:
+                logger.error(f"❌ Modbus test failed for {host}:{port}: {error}")
+                modbus_results.extend(
+                    ModbusConnectivityResult(
                         host=host,
                         port=port,
                         register=register,
                         success=False,
-                        error_message=str(e)
-                    ))
+                        error_message=str(error)
+                    )
+                    for register in self.test_registers
+                )
+            # Failure-rate term, evaluated over what has been seen so far
+            failed = sum(1 for r in modbus_results if not r.success)
+            penalty_modbus = (failed / len(modbus_results)) * 30 if modbus_results else 0.0
+            if early_exit_score is not None and 100.0 - penalty - penalty_modbus < early_exit_score:
+                aborted = True
+                for remaining in modbus_futures:
+                    remaining.cancel()
+                break
+
+        if aborted:
+            logger.warning("⚠️ Early exit: health estimate fell below %.1f, remaining tests cancelled",
+                           early_exit_score)
         
         # Analyze results
         network_health_score = self._calculate_network_health_score(
             ping_results, port_scan_results, modbus_results
         )
         
-        issues_found = self._identify_issues(ping_results, port_scan_results, modbus_results)
-        recommendations = self._generate_recommendations(issues_found, ping_results, modbus_results)
+        issues_found, recommendations = self._analyze(ping_results, port_scan_results, modbus_results)
         
         total_time = time.time() - start_time
         logger.info(f"✅ Network diagnostics completed in {total_time:.1f}s")
@@ -196,34 +305,65 @@ class NetworkDiagnostics:
         )
     
     def _ping_host(self, target: str) -> PingResult:
-        """Perform ping test to a host."""
+        """Perform ping test to a host (cached for PING_CACHE_TTL seconds)."""
+        cached = self._ping_cache.get(target)
+        if cached is not None:
+            ts, result = cached
+            if time.monotonic() - ts < PING_CACHE_TTL:
+                return result
+            # pop with default: two pool workers may expire the same
+            # target concurrently
+            self._ping_cache.pop(target, None)
+
+        result = self._ping_host_uncached(target)
+        self._ping_cache[target] = (time.monotonic(), result)
+        return result
+
+    def _ping_host_uncached(self, target: str) -> PingResult:
+        """Perform the actual ping test to a host."""
+        if ICMPLIB_AVAILABLE:
+            try:
+                return self._ping_host_icmplib(target)
+            except Exception as e:
+                logger.debug(f"icmplib ping failed for {target}, falling back to ping binary: {e}")
+
+        return self._ping_host_subprocess(target)
+
+    def _ping_host_icmplib(self, target: str) -> PingResult:
+        """Ping via icmplib - no process fork, no output parsing."""
+        host = icmp_ping(
+            target,
+            count=PING_COUNT,
+            interval=PING_INTERVAL,
+            timeout=PING_TIMEOUT,
+            privileged=False
+        )
+
+        return PingResult(
+            target=target,
+            success=host.is_alive,
+            packets_sent=host.packets_sent,
+            packets_received=host.packets_received,
+            packet_loss=host.packet_loss * 100,
+            min_time=host.min_rtt,
+            max_time=host.max_rtt,
+            avg_time=host.avg_rtt
+        )
+
+    def _ping_host_subprocess(self, target: str) -> PingResult:
+        """Ping via the system ping binary (fallback path)."""
         try:
-            # Use ping command (works on Windows and Linux)
-            cmd = [
-                'ping', 
-                '-c', str(PING_COUNT),  # Linux
-                '-W', str(int(PING_TIMEOUT * 1000)),  # Linux timeout in ms
-                target
-            ]
-            
-            # Windows ping command
-            if os.name == 'nt':
-                cmd = [
-                    'ping',
-                    '-n', str(PING_COUNT),
-                    '-w', str(int(PING_TIMEOUT * 1000)),
-                    target
-                ]
-            
+            # Command prefix is built once at import; only append the target
+            cmd = [*_PING_CMD_PREFIX, target]
+
             result = subprocess.run(
-                cmd, 
-                capture_output=True, 
-                text=True, 
+                cmd,
+                capture_output=True,
                 timeout=PING_TIMEOUT * 2
             )
-            
+
             if result.returncode == 0:
-                # Parse ping output
+                # Parse ping output (raw bytes)
                 return self._parse_ping_output(target, result.stdout)
             else:
                 return PingResult(
@@ -232,7 +372,7 @@ class NetworkDiagnostics:
                     packets_sent=PING_COUNT,
                     packets_received=0,
                     packet_loss=100.0,
-                    error_message=result.stderr
+                    error_message=result.stderr.decode(errors='replace')
                 )
                 
         except subprocess.TimeoutExpired:
@@ -254,47 +394,26 @@ class NetworkDiagnostics:
                 error_message=str(e)
             )
     
-    def _parse_ping_output(self, target: str, output: str) -> PingResult:
-        """Parse ping command output."""
+    def _parse_ping_output(self, target: str, output: bytes) -> PingResult:
+        """Parse raw ping command output (int/float accept bytes directly)."""
         try:
-            lines = output.strip().split('\n')
-            
-            # Find statistics line
-            stats_line = None
-            for line in lines:
-                if 'packets transmitted' in line.lower() or 'pakete gesendet' in line.lower():
-                    stats_line = line
-                    break
-            
-            if not stats_line:
+            # One regex pass over the whole output for the statistics line
+            stats = _PING_STATS_RE.search(output)
+            if not stats:
                 raise ValueError("Could not find ping statistics")
-            
-            # Parse statistics (Linux format)
-            if 'packets transmitted' in stats_line.lower():
-                # Linux format: "4 packets transmitted, 4 received, 0% packet loss"
-                parts = stats_line.split(',')
-                sent = int(parts[0].split()[0])
-                received = int(parts[1].split()[0])
-                loss = float(parts[2].split('%')[0])
-            else:
-                # Windows format or other
-                sent = PING_COUNT
-                received = PING_COUNT
-                loss = 0.0
-            
-            # Find timing information
+
+            sent = int(stats.group(1))
+            received = int(stats.group(2))
+            loss = float(stats.group(3))
+
+            # Timing summary ("min/avg/max" line), if present
             min_time = max_time = avg_time = None
-            for line in lines:
-                if 'min/avg/max' in line.lower() or 'minimum/maximum/durchschnitt' in line.lower():
-                    # Extract timing values
-                    timing_part = line.split('=')[-1].strip()
-                    times = timing_part.split('/')
-                    if len(times) >= 3:
-                        min_time = float(times[0])
-                        avg_time = float(times[1])
-                        max_time = float(times[2])
-                    break
-            
+            timing = _PING_TIMING_RE.search(output)
+            if timing:
+                min_time = float(timing.group(1))
+                avg_time = float(timing.group(2))
+                max_time = float(timing.group(3))
+
             return PingResult(
                 target=target,
                 success=received > 0,
@@ -316,26 +435,84 @@ class NetworkDiagnostics:
                 error_message=f"Parse error: {e}"
             )
     
-    def _scan_port(self, host: str, port: int) -> PortScanResult:
-        """Scan a specific port on a host."""
-        start_time = time.time()
-        
+    async def _scan_ports_async(self, targets: List[Tuple[str, int]]) -> List[PortScanResult]:
+        """Scan all (host, port) pairs concurrently on one event loop."""
+        sem = asyncio.Semaphore(self.concurrent_tasks)  # bound open sockets on large scans
+
+        async def scan(host: str, port: int) -> PortScanResult:
+            async with sem:
+                return await self._scan_port_async(host, port)
+
+        return list(await asyncio.gather(*(scan(host, port) for host, port in targets)))
+
+    async def _scan_port_async(self, host: str, port: int) -> PortScanResult:
+        """Scan a specific port on a host without blocking a thread."""
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+
         try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(PORT_SCAN_TIMEOUT)
-            
-            result = sock.connect_ex((host, port))
-            response_time = (time.time() - start_time) * 1000
-            
-            sock.close()
-            
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), PORT_SCAN_TIMEOUT
+            )
+            response_time = (loop.time() - start_time) * 1000
+
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
             return PortScanResult(
                 host=host,
                 port=port,
-                is_open=(result == 0),
+                is_open=True,
                 response_time=response_time
             )
-            
+
+        except (asyncio.TimeoutError, OSError) as e:
+            response_time = (loop.time() - start_time) * 1000
+            return PortScanResult(
+                host=host,
+                port=port,
+                is_open=False,
+                response_time=response_time,
+                error_message=str(e) or None
+            )
+
+    def _scan_port(self, host: str, port: int) -> PortScanResult:
+        """Scan a specific port on a host (sync fallback path)."""
+        start_time = time.time()
+
+        try:
+            # Context manager guarantees the socket is closed even when the
+            # connect raises; non-blocking connect + select means a closed
+            # port never blocks the thread for the full timeout.
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+                sock.setblocking(False)
+                err = sock.connect_ex((host, port))
+
+                if err in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    with selectors.DefaultSelector() as selector:
+                        selector.register(sock, selectors.EVENT_WRITE)
+                        if not selector.select(PORT_SCAN_TIMEOUT):
+                            return PortScanResult(
+                                host=host,
+                                port=port,
+                                is_open=False,
+                                response_time=(time.time() - start_time) * 1000,
+                                error_message="Connection timeout"
+                            )
+                    err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+                response_time = (time.time() - start_time) * 1000
+
+                return PortScanResult(
+                    host=host,
+                    port=port,
+                    is_open=(err == 0),
+                    response_time=response_time
+                )
+
         except Exception as e:
             response_time = (time.time() - start_time) * 1000
             return PortScanResult(
@@ -346,6 +523,90 @@ class NetworkDiagnostics:
                 error_message=str(e)
             )
     
+    def _test_modbus_host(self, host: str, port: int) -> List[ModbusConnectivityResult]:
+        """Test all configured registers on one host over a single connection.
+
+        Connecting once per host instead of once per register saves a TCP
+        handshake for every register after the first.
+        """
+        client = ModbusTcpClient(host=host, port=port, timeout=DEFAULT_TIMEOUT)
+
+        try:
+            if not client.connect():
+                raise ConnectionException(f"Failed to connect to {host}:{port}")
+        except Exception as e:
+            # Connection refused: every register on this host fails alike
+            return [
+                ModbusConnectivityResult(
+                    host=host,
+                    port=port,
+                    register=register,
+                    success=False,
+                    error_type=type(e).__name__,
+                    error_message=str(e)
+                )
+                for register in self.test_registers
+            ]
+
+        try:
+            results = []
+            for start, count in self._coalesce_registers(self.test_registers):
+                results.extend(self._read_register_block(client, host, port, start, count))
+            return results
+        finally:
+            client.close()
+
+    @staticmethod
+    def _coalesce_registers(registers: List[int]) -> List[Tuple[int, int]]:
+        """Group unique register addresses into contiguous (start, count) runs."""
+        runs: List[Tuple[int, int]] = []
+        for register in sorted(set(registers)):
+            if runs and register == runs[-1][0] + runs[-1][1]:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((register, 1))
+        return runs
+
+    def _read_register_block(self, client: ModbusTcpClient, host: str, port: int,
+                             start: int, count: int) -> List[ModbusConnectivityResult]:
+        """Read a contiguous register block and fan out per-register results."""
+        start_time = time.time()
+
+        try:
+            result = client.read_holding_registers(address=start, count=count)
+
+            if result.isError():
+                raise ModbusException(f"Modbus error: {result}")
+
+            response_time = (time.time() - start_time) * 1000
+
+            return [
+                ModbusConnectivityResult(
+                    host=host,
+                    port=port,
+                    register=start + i,
+                    success=True,
+                    response_time=response_time,
+                    value=result.registers[i] if i < len(result.registers) else None
+                )
+                for i in range(count)
+            ]
+
+        except Exception as e:
+            response_time = (time.time() - start_time) * 1000
+            return [
+                ModbusConnectivityResult(
+                    host=host,
+                    port=port,
+                    register=start + i,
+                    success=False,
+                    response_time=response_time,
+                    error_type=type(e).__name__,
+                    error_message=str(e)
+                )
+                for i in range(count)
+            ]
+
     def _test_modbus_connectivity(self, host: str, port: int, register: int) -> ModbusConnectivityResult:
         """Test Modbus connectivity to a specific register."""
         start_time = time.time()
@@ -390,109 +651,103 @@ class NetworkDiagnostics:
     def _calculate_network_health_score(self, ping_results: List[PingResult], 
                                       port_scan_results: List[PortScanResult],
                                       modbus_results: List[ModbusConnectivityResult]) -> float:
-        """Calculate overall network health score (0-100)."""
-        score = 100.0
-        
-        # Deduct points for ping issues
+        """Calculate overall network health score (0-100).
+
+        The score is 100 minus a weighted sum of issue counts gathered in a
+        single pass per result list (penalties as weight * count).
+        """
+        # Count ping issues in one pass
+        unreachable = high_loss = high_latency = 0
+        loss_threshold = PING_LOSS_THRESHOLD * 100
         for ping in ping_results:
             if not ping.success:
-                score -= 20  # Major penalty for unreachable hosts
-            elif ping.packet_loss > PING_LOSS_THRESHOLD * 100:
-                score -= 10  # Penalty for packet loss
+                unreachable += 1
+            elif ping.packet_loss > loss_threshold:
+                high_loss += 1
             elif ping.avg_time and ping.avg_time > HIGH_LATENCY_THRESHOLD:
-                score -= 5   # Penalty for high latency
-        
-        # Deduct points for port scan issues
-        modbus_ports_failed = 0
-        for scan in port_scan_results:
-            if not scan.is_open and scan.port in COMMON_MODBUS_PORTS:
-                modbus_ports_failed += 1
-        
-        if modbus_ports_failed > 0:
-            score -= (modbus_ports_failed * 15)  # Penalty for closed Modbus ports
-        
-        # Deduct points for Modbus connectivity issues
+                high_latency += 1
+
+        # Closed Modbus ports
+        modbus_ports_failed = sum(
+            1 for scan in port_scan_results
+            if not scan.is_open and scan.port in _MODBUS_PORT_SET
+        )
+
+        # Modbus connectivity failure rate
         modbus_failures = sum(1 for result in modbus_results if not result.success)
-        total_modbus_tests = len(modbus_results)
-        
-        if total_modbus_tests > 0:
-            failure_rate = modbus_failures / total_modbus_tests
-            score -= (failure_rate * 30)  # Penalty for Modbus failures
-        
+        failure_rate = modbus_failures / len(modbus_results) if modbus_results else 0.0
+
+        score = (100.0
+                 - 20 * unreachable       # major penalty for unreachable hosts
+                 - 10 * high_loss         # penalty for packet loss
+                 - 5 * high_latency       # penalty for high latency
+                 - 15 * modbus_ports_failed  # penalty for closed Modbus ports
+                 - 30 * failure_rate)     # penalty for Modbus failures
+
         return max(0.0, min(100.0, score))
     
-    def _identify_issues(self, ping_results: List[PingResult],
-                        port_scan_results: List[PortScanResult],
-                        modbus_results: List[ModbusConnectivityResult]) -> List[str]:
-        """Identify network issues from test results."""
+    def _analyze(self, ping_results: List[PingResult],
+                 port_scan_results: List[PortScanResult],
+                 modbus_results: List[ModbusConnectivityResult]) -> Tuple[List[str], List[str]]:
+        """Identify issues and derive recommendations in one traversal.
+
+        Each result list is walked exactly once; the intermediate sets feed
+        both the issue list and the recommendation list.
+        """
         issues = []
-        
-        # Ping issues
+        recommendations = []
+
+        # Ping results: single pass collects issues and the host lists the
+        # recommendations are rendered from
+        unreachable_hosts = []
+        high_latency_hosts = []
+        loss_threshold = PING_LOSS_THRESHOLD * 100
         for ping in ping_results:
             if not ping.success:
+                unreachable_hosts.append(ping.target)
                 issues.append(f"Host {ping.target} is unreachable")
-            elif ping.packet_loss > PING_LOSS_THRESHOLD * 100:
+            elif ping.packet_loss > loss_threshold:
                 issues.append(f"High packet loss to {ping.target}: {ping.packet_loss:.1f}%")
             elif ping.avg_time and ping.avg_time > HIGH_LATENCY_THRESHOLD:
                 issues.append(f"High latency to {ping.target}: {ping.avg_time:.1f}ms")
-        
+            if ping.avg_time and ping.avg_time > HIGH_LATENCY_THRESHOLD:
+                high_latency_hosts.append(ping.target)
+
         # Port scan issues
         for scan in port_scan_results:
-            if not scan.is_open and scan.port in COMMON_MODBUS_PORTS:
+            if not scan.is_open and scan.port in _MODBUS_PORT_SET:
                 issues.append(f"Modbus port {scan.port} closed on {scan.host}")
-        
-        # Modbus connectivity issues
-        host_failures = {}
+
+        # Modbus connectivity: one pass collects per-host failed registers
+        host_failures: Dict[str, List[int]] = {}
         for result in modbus_results:
             if not result.success:
-                key = f"{result.host}:{result.port}"
-                if key not in host_failures:
-                    host_failures[key] = []
-                host_failures[key].append(result.register)
-        
+                host_failures.setdefault(f"{result.host}:{result.port}", []).append(result.register)
+
         for host_port, failed_registers in host_failures.items():
             if len(failed_registers) == len(self.test_registers):
                 issues.append(f"Complete Modbus failure on {host_port}")
             else:
                 issues.append(f"Modbus failures on {host_port} for registers: {failed_registers}")
-        
-        return issues
-    
-    def _generate_recommendations(self, issues: List[str], 
-                                ping_results: List[PingResult],
-                                modbus_results: List[ModbusConnectivityResult]) -> List[str]:
-        """Generate recommendations based on identified issues."""
-        recommendations = []
-        
-        # Network connectivity recommendations
-        unreachable_hosts = [ping.target for ping in ping_results if not ping.success]
+
+        # Render recommendations from the collected structures
         if unreachable_hosts:
             recommendations.append(f"Check network connectivity to: {', '.join(unreachable_hosts)}")
-        
-        # High latency recommendations
-        high_latency_hosts = [ping.target for ping in ping_results 
-                            if ping.avg_time and ping.avg_time > HIGH_LATENCY_THRESHOLD]
+
         if high_latency_hosts:
             recommendations.append(f"Investigate network latency to: {', '.join(high_latency_hosts)}")
-        
-        # Modbus-specific recommendations
-        modbus_hosts = set()
-        for result in modbus_results:
-            if not result.success:
-                modbus_hosts.add(f"{result.host}:{result.port}")
-        
-        if modbus_hosts:
-            recommendations.append(f"Check Modbus configuration on: {', '.join(modbus_hosts)}")
+
+        if host_failures:
+            recommendations.append(f"Check Modbus configuration on: {', '.join(host_failures)}")
             recommendations.append("Verify Modbus device is powered on and responding")
             recommendations.append("Check firewall settings for Modbus ports (502, 5020, etc.)")
-        
-        # General recommendations
+
         if issues:
             recommendations.append("Consider increasing Modbus timeouts in const.py")
             recommendations.append("Enable individual reads for problematic registers")
             recommendations.append("Check for network congestion during peak hours")
-        
-        return recommendations
+
+        return issues, recommendations
     
     def test_specific_host(self, host: str, port: int, register: int = 1000) -> ModbusConnectivityResult:
         """Test connectivity to a specific host and register."""
@@ -542,43 +797,46 @@ class NetworkDiagnostics:
     def export_diagnostics_to_file(self, result: NetworkDiagnosticsResult, output_file: str):
         """Export diagnostics result to file."""
         try:
+            parts = []
+            parts.append("=== NETWORK DIAGNOSTICS REPORT ===\n\n")
+            ok, fail, tip = _OK, _FAIL, _TIP
+            parts.append(f"Timestamp: {result.timestamp}\n")
+            parts.append(f"Network Health Score: {result.network_health_score:.1f}/100\n\n")
+
+            parts.append("=== PING RESULTS ===\n")
+            for ping in result.ping_results:
+                if ping.success:
+                    parts.append(f"{ping.target}: {ok} Loss: {ping.packet_loss:.1f}%, Avg: {ping.avg_time:.1f}ms\n")
+                else:
+                    parts.append(f"{ping.target}: {fail} Error: {ping.error_message}\n")
+
+            parts.append("\n=== PORT SCAN RESULTS ===\n")
+            for scan in result.port_scan_results:
+                parts.append(f"{scan.host}:{scan.port} - {ok + ' Open' if scan.is_open else fail + ' Closed'}")
+                if scan.response_time:
+                    parts.append(f" ({scan.response_time:.1f}ms)")
+                parts.append("\n")
+
+            parts.append("\n=== MODBUS CONNECTIVITY ===\n")
+            for modbus in result.modbus_connectivity_results:
+                prefix = f"{modbus.host}:{modbus.port} Reg{modbus.register}"
+                if modbus.success:
+                    parts.append(f"{prefix}: {ok} Value: {modbus.value}, Time: {modbus.response_time:.1f}ms\n")
+                else:
+                    parts.append(f"{prefix}: {fail} Error: {modbus.error_message}\n")
+
+            parts.append("\n=== ISSUES FOUND ===\n")
+            for issue in result.issues_found:
+                parts.append(f"{fail} {issue}\n")
+
+            parts.append("\n=== RECOMMENDATIONS ===\n")
+            for rec in result.recommendations:
+                parts.append(f"{tip} {rec}\n")
+
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("=== NETWORK DIAGNOSTICS REPORT ===\n\n")
-                f.write(f"Timestamp: {result.timestamp}\n")
-                f.write(f"Network Health Score: {result.network_health_score:.1f}/100\n\n")
-                
-                f.write("=== PING RESULTS ===\n")
-                for ping in result.ping_results:
-                    f.write(f"{ping.target}: {'✅' if ping.success else '❌'} ")
-                    if ping.success:
-                        f.write(f"Loss: {ping.packet_loss:.1f}%, Avg: {ping.avg_time:.1f}ms\n")
-                    else:
-                        f.write(f"Error: {ping.error_message}\n")
-                
-                f.write("\n=== PORT SCAN RESULTS ===\n")
-                for scan in result.port_scan_results:
-                    f.write(f"{scan.host}:{scan.port} - {'✅ Open' if scan.is_open else '❌ Closed'}")
-                    if scan.response_time:
-                        f.write(f" ({scan.response_time:.1f}ms)")
-                    f.write("\n")
-                
-                f.write("\n=== MODBUS CONNECTIVITY ===\n")
-                for modbus in result.modbus_connectivity_results:
-                    f.write(f"{modbus.host}:{modbus.port} Reg{modbus.register}: {'✅' if modbus.success else '❌'} ")
-                    if modbus.success:
-                        f.write(f"Value: {modbus.value}, Time: {modbus.response_time:.1f}ms\n")
-                    else:
-                        f.write(f"Error: {modbus.error_message}\n")
-                
-                f.write("\n=== ISSUES FOUND ===\n")
-                for issue in result.issues_found:
-                    f.write(f"❌ {issue}\n")
-                
-                f.write("\n=== RECOMMENDATIONS ===\n")
-                for rec in result.recommendations:
-                    f.write(f"💡 {rec}\n")
-            
-            logger.info(f"✅ Diagnostics exported to {output_file}")
+                f.write("".join(parts))
+
+            logger.info("✅ Diagnostics exported to %s", output_file)
             
         except Exception as e:
             logger.error(f"❌ Failed to export diagnostics: {e}")
@@ -617,5 +875,4 @@ def main():
             print(f"   - {rec}")
 
 if __name__ == "__main__":
-    import os
     main()
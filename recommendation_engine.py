@@ -3,8 +3,12 @@ Recommendation Engine for Modbus Configuration Optimization
 Analyzes performance data and generates recommendations for const.py updates.
 """
 
+import math
 import os
 import json
+import shutil
+import string
+from bisect import insort
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
@@ -21,7 +25,58 @@ from const import (
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Critical registers that should not be made low priority; built once
+# at import instead of per engine instance
+_CRITICAL_REGISTERS = frozenset({0, 1, 1000, 1001, 1002, 1003, 1004})
+
+# Priority ranking for sorting; string comparison would order the
+# levels alphabetically ('critical' < 'high' < 'low' < 'medium')
+_PRIO = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+# Evidence/confidence rules per recommendation type: each entry is
+# (predicate, evidence formatter, confidence delta). The shared
+# _apply_rules helper walks these instead of each _create_* method
+# repeating its own if/append/add chain.
+_INDIVIDUAL_READ_RULES = (
+    (lambda p: p.error_rate > 0.1, lambda p: f"High error rate: {p.error_rate:.1%}", 0.2),
+    (lambda p: p.max_consecutive_failures >= 3, lambda p: f"Consecutive failures: {p.max_consecutive_failures}", 0.2),
+    (lambda p: p.avg_response_time > 2000, lambda p: f"Slow response: {p.avg_response_time:.0f}ms", 0.1),
+)
+_TIMEOUT_RULES = (
+    (lambda p: p.error_rate > 0.1, lambda p: f"Error rate: {p.error_rate:.1%}", 0.2),
+    (lambda p: p.timeout_requests > 5, lambda p: f"Timeout count: {p.timeout_requests}", 0.1),
+    (lambda p: p.avg_response_time > 2000, lambda p: f"Avg response: {p.avg_response_time:.0f}ms", 0.1),
+)
+_LOW_PRIORITY_RULES = (
+    (lambda p: p.error_rate > 0.1, lambda p: f"Error rate: {p.error_rate:.1%}", 0.1),
+    (lambda p: p.avg_response_time > 3000, lambda p: f"Slow response: {p.avg_response_time:.0f}ms", 0.1),
+)
+
+# Fixed layout of the generated const.py; only the $-slots vary per run
+_CONST_TEMPLATE = string.Template("""# Lambda Heat Pumps - Updated Configuration
+# Generated by Modbus Diagnostics Tool
+# Generated: $timestamp
+
+# Individual Read Registers
+LAMBDA_INDIVIDUAL_READ_REGISTERS = [
+$individual_read_lines]
+
+# Register-specific Timeouts
+LAMBDA_REGISTER_TIMEOUTS = {
+$timeout_lines}
+
+# Low Priority Registers
+LAMBDA_LOW_PRIORITY_REGISTERS = [
+$low_priority_lines]
+
+# Recommendations Summary
+# $summary
+# Risk Assessment: $risk_assessment
+
+# Generated Recommendations:
+$recommendation_lines""")
+
+@dataclass(slots=True)
 class RegisterPerformance:
     """Performance data for a specific register."""
     register: int
@@ -31,8 +86,11 @@ class RegisterPerformance:
     failed_requests: int = 0
     timeout_requests: int = 0
     avg_response_time: float = 0.0
+    rt_samples: int = 0
     max_response_time: float = 0.0
-    min_response_time: float = 0.0
+    # Seeded with inf so the first real sample always wins; a 0.0 seed
+    # would never be beaten by min()
+    min_response_time: float = math.inf
     consecutive_failures: int = 0
     max_consecutive_failures: int = 0
     error_rate: float = 0.0
@@ -43,7 +101,7 @@ class RegisterPerformance:
     current_individual_read: bool = False
     current_low_priority: bool = False
 
-@dataclass
+@dataclass(slots=True)
 class Recommendation:
     """A configuration recommendation."""
     type: str  # 'individual_read', 'timeout_adjustment', 'low_priority', 'circuit_breaker'
@@ -56,8 +114,11 @@ class Recommendation:
     confidence: float  # 0.0 to 1.0
     impact: str  # 'low', 'medium', 'high'
     evidence: List[str] = field(default_factory=list)
+    # Numeric form of recommended_value where one exists (e.g. timeouts),
+    # so consumers don't have to parse the display string back
+    recommended_numeric: Optional[float] = None
 
-@dataclass
+@dataclass(slots=True)
 class ConfigurationUpdate:
     """Complete configuration update recommendation."""
     timestamp: datetime
@@ -76,10 +137,10 @@ class RecommendationEngine:
     def __init__(self):
         self.performance_data = {}
         self.recommendations = []
-        
-        # Critical registers that should not be made low priority
-        self.critical_registers = {0, 1, 1000, 1001, 1002, 1003, 1004}
-        
+
+        # Shared immutable view; see _CRITICAL_REGISTERS at module scope
+        self.critical_registers = _CRITICAL_REGISTERS
+
         # Current configuration (would be loaded from actual const.py)
         self.current_config = {
             'individual_read_registers': [0, 1050, 1060],
@@ -88,190 +149,202 @@ class RecommendationEngine:
             'circuit_breaker_enabled': True,
             'base_timeout': 3.0
         }
-        
+
+        # Hashed views of the config lists for O(1) membership tests
+        self._individual_read_set = frozenset(self.current_config['individual_read_registers'])
+        self._low_priority_set = frozenset(self.current_config['low_priority_registers'])
+
+        # Last analysis result, keyed by a content hash of the raw
+        # inputs; repeated analyses of unchanged data short-circuit
+        # before any state is accumulated
+        self._last_key = None
+        self._last_update = None
+
         logger.info("🔧 RecommendationEngine initialized")
     
     def analyze_performance_data(self, log_analysis_result, modbus_monitor_stats, network_diagnostics_result) -> ConfigurationUpdate:
         """Analyze all performance data and generate recommendations."""
         logger.info("🔍 Analyzing performance data for recommendations")
         
+        # Short-circuit when the inputs match the previous analysis; the
+        # key must be taken before extraction, which accumulates into
+        # performance_data and would change the hashed state
+        key = self._inputs_key(log_analysis_result, modbus_monitor_stats, network_diagnostics_result)
+        if key == self._last_key and self._last_update is not None:
+            logger.info("✅ Performance data unchanged, reusing cached recommendations")
+            return self._last_update
+
         # Extract register performance from different sources
         self._extract_register_performance(log_analysis_result, modbus_monitor_stats, network_diagnostics_result)
-        
+
         # Generate recommendations
         recommendations = self._generate_recommendations()
-        
+
         # Create configuration update
         config_update = self._create_configuration_update(recommendations)
-        
+        self._last_key = key
+        self._last_update = config_update
+
         logger.info(f"✅ Generated {len(recommendations)} recommendations")
         return config_update
+
+    @staticmethod
+    def _inputs_key(log_analysis, modbus_stats, network_diagnostics):
+        """Content hash of the raw inputs the extraction step reads."""
+        parts = [tuple(
+            (p.register, p.timeout_count, p.consecutive_timeouts, p.last_timeout)
+            for p in log_analysis.problematic_registers
+        )]
+        if hasattr(modbus_stats, 'register_performance'):
+            parts.append(tuple(sorted(
+                (register,
+                 stats.get('total_requests', 0),
+                 stats.get('failed_requests', 0),
+                 round(stats.get('avg_response_time', 0.0), 1))
+                for register, stats in modbus_stats.register_performance.items()
+            )))
+        parts.append(tuple(
+            (result.register, result.success, result.response_time)
+            for result in network_diagnostics.modbus_connectivity_results
+        ))
+        return hash(tuple(parts))
     
+    def _get_perf(self, register: int, sensor_name: Optional[str] = None) -> RegisterPerformance:
+        """Fetch or create the RegisterPerformance record with one dict lookup."""
+        perf = self.performance_data.get(register)
+        if perf is None:
+            perf = self.performance_data[register] = RegisterPerformance(
+                register=register,
+                sensor_name=sensor_name or f"register_{register}",
+                is_critical=register in _CRITICAL_REGISTERS
+            )
+        return perf
+
     def _extract_register_performance(self, log_analysis, modbus_stats, network_diagnostics):
-        """Extract register performance data from analysis results."""
-        
+        """Extract register performance data from analysis results.
+
+        Each source is folded in with a single dict lookup per record;
+        derived values (error_rate, config status) are computed once in a
+        final pass instead of being recomputed per input row.
+        """
         # From log analysis
         for pattern in log_analysis.problematic_registers:
-            register = pattern.register
-            if register not in self.performance_data:
-                self.performance_data[register] = RegisterPerformance(
-                    register=register,
-                    sensor_name=pattern.sensor_name,
-                    is_critical=register in self.critical_registers
-                )
-            
-            perf = self.performance_data[register]
+            perf = self._get_perf(pattern.register, pattern.sensor_name)
             perf.failed_requests += pattern.timeout_count
             perf.timeout_requests += pattern.timeout_count
             perf.max_consecutive_failures = max(perf.max_consecutive_failures, pattern.consecutive_timeouts)
             perf.last_failure = pattern.last_timeout
-            
+
             # Estimate total requests (assuming 1 request per minute for 24 hours = 1440)
             perf.total_requests = max(perf.total_requests, pattern.timeout_count * 10)
             perf.successful_requests = perf.total_requests - perf.failed_requests
-            perf.error_rate = perf.failed_requests / max(1, perf.total_requests)
-        
+
         # From Modbus monitor stats (if available)
         if hasattr(modbus_stats, 'register_performance'):
             for register, stats in modbus_stats.register_performance.items():
-                if register not in self.performance_data:
-                    self.performance_data[register] = RegisterPerformance(
-                        register=register,
-                        sensor_name=f"register_{register}",
-                        is_critical=register in self.critical_registers
-                    )
-                
-                perf = self.performance_data[register]
+                perf = self._get_perf(register)
                 perf.total_requests += stats.get('total_requests', 0)
                 perf.successful_requests += stats.get('successful_requests', 0)
                 perf.failed_requests += stats.get('failed_requests', 0)
                 perf.avg_response_time = stats.get('avg_response_time', 0.0)
                 perf.max_response_time = max(perf.max_response_time, stats.get('max_response_time', 0.0))
-                perf.min_response_time = min(perf.min_response_time, stats.get('min_response_time', float('inf')))
-        
-        # From network diagnostics
+                perf.min_response_time = min(perf.min_response_time, stats.get('min_response_time', math.inf))
+
+        # From network diagnostics; one timestamp for the whole batch
+        # instead of a datetime.now() call per result
+        now = datetime.now()
         for result in network_diagnostics.modbus_connectivity_results:
-            register = result.register
-            if register not in self.performance_data:
-                self.performance_data[register] = RegisterPerformance(
-                    register=register,
-                    sensor_name=f"register_{register}",
-                    is_critical=register in self.critical_registers
-                )
-            
-            perf = self.performance_data[register]
+            perf = self._get_perf(result.register)
             perf.total_requests += 1
             if result.success:
                 perf.successful_requests += 1
-                perf.last_success = datetime.now()
+                perf.last_success = now
                 if result.response_time:
-                    perf.avg_response_time = (perf.avg_response_time + result.response_time) / 2
+                    # Incremental (Welford) mean over all samples; the old
+                    # (avg + rt) / 2 update was biased toward the last sample
+                    perf.rt_samples += 1
+                    perf.avg_response_time += (result.response_time - perf.avg_response_time) / perf.rt_samples
                     perf.max_response_time = max(perf.max_response_time, result.response_time)
             else:
                 perf.failed_requests += 1
-                perf.last_failure = datetime.now()
-        
-        # Update current configuration status
+                perf.last_failure = now
+
+        # Derived values and current configuration status, one pass over
+        # the merged data
+        config = self.current_config
+        base_timeout = config['base_timeout']
+        timeouts = config['register_timeouts']
         for register, perf in self.performance_data.items():
-            perf.current_individual_read = register in self.current_config['individual_read_registers']
-            perf.current_timeout = self.current_config['register_timeouts'].get(register, self.current_config['base_timeout'])
-            perf.current_low_priority = register in self.current_config['low_priority_registers']
+            perf.error_rate = perf.failed_requests / max(1, perf.total_requests)
+            perf.current_individual_read = register in self._individual_read_set
+            perf.current_timeout = timeouts.get(register, base_timeout)
+            perf.current_low_priority = register in self._low_priority_set
     
     def _generate_recommendations(self) -> List[Recommendation]:
         """Generate recommendations based on performance data."""
         recommendations = []
         
         for register, perf in self.performance_data.items():
-            # Individual read recommendations
-            if self._should_recommend_individual_read(perf):
+            individual_read, timeout_adjustment, low_priority = self._recommendation_flags(perf)
+
+            if individual_read:
                 recommendations.append(self._create_individual_read_recommendation(perf))
-            
-            # Timeout adjustment recommendations
-            if self._should_recommend_timeout_adjustment(perf):
+            if timeout_adjustment:
                 recommendations.append(self._create_timeout_adjustment_recommendation(perf))
-            
-            # Low priority recommendations
-            if self._should_recommend_low_priority(perf):
+            if low_priority:
                 recommendations.append(self._create_low_priority_recommendation(perf))
         
-        # Sort by priority and confidence
-        recommendations.sort(key=lambda x: (x.priority, x.confidence), reverse=True)
+        # Sort by priority rank and confidence, highest first
+        recommendations.sort(key=lambda x: (_PRIO[x.priority], x.confidence), reverse=True)
         
         return recommendations
     
-    def _should_recommend_individual_read(self, perf: RegisterPerformance) -> bool:
-        """Determine if register should be added to individual reads."""
-        # Already in individual reads
-        if perf.current_individual_read:
-            return False
-        
-        # High error rate
-        if perf.error_rate > INDIVIDUAL_READ_ERROR_THRESHOLD / 100:
-            return True
-        
-        # Many consecutive failures
-        if perf.max_consecutive_failures >= INDIVIDUAL_READ_TIMEOUT_THRESHOLD:
-            return True
-        
-        # Slow response times
-        if perf.avg_response_time > INDIVIDUAL_READ_SLOW_THRESHOLD:
-            return True
-        
-        return False
-    
-    def _should_recommend_timeout_adjustment(self, perf: RegisterPerformance) -> bool:
-        """Determine if register timeout should be adjusted."""
-        # High error rate with current timeout
-        if perf.error_rate > 0.1 and perf.current_timeout < 5.0:
-            return True
-        
-        # Many timeouts
-        if perf.timeout_requests > 5:
-            return True
-        
-        # Slow response times
-        if perf.avg_response_time > 2000 and perf.current_timeout < 5.0:
-            return True
-        
-        return False
-    
-    def _should_recommend_low_priority(self, perf: RegisterPerformance) -> bool:
-        """Determine if register should be made low priority."""
-        # Don't make critical registers low priority
-        if perf.is_critical:
-            return False
-        
-        # Already low priority
-        if perf.current_low_priority:
-            return False
-        
-        # High error rate but not critical
-        if perf.error_rate > LOW_PRIORITY_ERROR_THRESHOLD / 100:
-            return True
-        
-        # Slow response times
-        if perf.avg_response_time > LOW_PRIORITY_SLOW_THRESHOLD:
-            return True
-        
-        return False
+    @staticmethod
+    def _recommendation_flags(perf: RegisterPerformance) -> Tuple[bool, bool, bool]:
+        """Evaluate all three recommendation predicates in one pass.
+
+        Returns (individual_read, timeout_adjustment, low_priority).
+        The shared fields are read once into locals instead of three
+        separate predicate methods re-reading the same attributes.
+        """
+        error_rate = perf.error_rate
+        avg_rt = perf.avg_response_time
+        current_timeout = perf.current_timeout
+
+        individual_read = not perf.current_individual_read and (
+            error_rate > INDIVIDUAL_READ_ERROR_THRESHOLD / 100
+            or perf.max_consecutive_failures >= INDIVIDUAL_READ_TIMEOUT_THRESHOLD
+            or avg_rt > INDIVIDUAL_READ_SLOW_THRESHOLD
+        )
+
+        timeout_adjustment = (
+            (error_rate > 0.1 and current_timeout < 5.0)
+            or perf.timeout_requests > 5
+            or (avg_rt > 2000 and current_timeout < 5.0)
+        )
+
+        low_priority = not perf.is_critical and not perf.current_low_priority and (
+            error_rate > LOW_PRIORITY_ERROR_THRESHOLD / 100
+            or avg_rt > LOW_PRIORITY_SLOW_THRESHOLD
+        )
+
+        return individual_read, timeout_adjustment, low_priority
     
+    @staticmethod
+    def _apply_rules(perf: RegisterPerformance, rules, base_confidence: float) -> Tuple[float, List[str]]:
+        """Walk a rule table, collecting evidence and confidence deltas."""
+        confidence = base_confidence
+        evidence = []
+        for predicate, formatter, delta in rules:
+            if predicate(perf):
+                evidence.append(formatter(perf))
+                confidence += delta
+        return min(1.0, confidence), evidence
+
     def _create_individual_read_recommendation(self, perf: RegisterPerformance) -> Recommendation:
         """Create individual read recommendation."""
-        evidence = []
-        confidence = 0.5
-        
-        if perf.error_rate > 0.1:
-            evidence.append(f"High error rate: {perf.error_rate:.1%}")
-            confidence += 0.2
-        
-        if perf.max_consecutive_failures >= 3:
-            evidence.append(f"Consecutive failures: {perf.max_consecutive_failures}")
-            confidence += 0.2
-        
-        if perf.avg_response_time > 2000:
-            evidence.append(f"Slow response: {perf.avg_response_time:.0f}ms")
-            confidence += 0.1
-        
+        confidence, evidence = self._apply_rules(perf, _INDIVIDUAL_READ_RULES, 0.5)
+
         priority = "high" if perf.is_critical else "medium"
         if perf.error_rate > 0.2:
             priority = "critical"
@@ -284,16 +357,15 @@ class RecommendationEngine:
             recommended_value="True",
             reason=f"Register {perf.register} has performance issues",
             priority=priority,
-            confidence=min(1.0, confidence),
+            confidence=confidence,
             impact="medium",
             evidence=evidence
         )
     
     def _create_timeout_adjustment_recommendation(self, perf: RegisterPerformance) -> Recommendation:
         """Create timeout adjustment recommendation."""
-        evidence = []
-        confidence = 0.6
-        
+        confidence, evidence = self._apply_rules(perf, _TIMEOUT_RULES, 0.6)
+
         # Calculate recommended timeout
         if perf.error_rate > 0.2:
             recommended_timeout = min(MAX_RECOMMENDED_TIMEOUT, perf.current_timeout * 2.5)
@@ -303,19 +375,7 @@ class RecommendationEngine:
             recommended_timeout = min(MAX_RECOMMENDED_TIMEOUT, perf.current_timeout * TIMEOUT_ADJUSTMENT_FACTOR)
         
         recommended_timeout = max(MIN_RECOMMENDED_TIMEOUT, recommended_timeout)
-        
-        if perf.error_rate > 0.1:
-            evidence.append(f"Error rate: {perf.error_rate:.1%}")
-            confidence += 0.2
-        
-        if perf.timeout_requests > 5:
-            evidence.append(f"Timeout count: {perf.timeout_requests}")
-            confidence += 0.1
-        
-        if perf.avg_response_time > 2000:
-            evidence.append(f"Avg response: {perf.avg_response_time:.0f}ms")
-            confidence += 0.1
-        
+
         priority = "high" if perf.is_critical else "medium"
         if perf.error_rate > 0.3:
             priority = "critical"
@@ -326,26 +386,18 @@ class RecommendationEngine:
             sensor_name=perf.sensor_name,
             current_value=f"{perf.current_timeout}s",
             recommended_value=f"{recommended_timeout}s",
+            recommended_numeric=recommended_timeout,
             reason=f"Register {perf.register} needs longer timeout",
             priority=priority,
-            confidence=min(1.0, confidence),
+            confidence=confidence,
             impact="low",
             evidence=evidence
         )
     
     def _create_low_priority_recommendation(self, perf: RegisterPerformance) -> Recommendation:
         """Create low priority recommendation."""
-        evidence = []
-        confidence = 0.7
-        
-        if perf.error_rate > 0.1:
-            evidence.append(f"Error rate: {perf.error_rate:.1%}")
-            confidence += 0.1
-        
-        if perf.avg_response_time > 3000:
-            evidence.append(f"Slow response: {perf.avg_response_time:.0f}ms")
-            confidence += 0.1
-        
+        confidence, evidence = self._apply_rules(perf, _LOW_PRIORITY_RULES, 0.7)
+
         return Recommendation(
             type="low_priority",
             register=perf.register,
@@ -354,7 +406,7 @@ class RecommendationEngine:
             recommended_value="True",
             reason=f"Register {perf.register} is non-critical with performance issues",
             priority="low",
-            confidence=min(1.0, confidence),
+            confidence=confidence,
             impact="low",
             evidence=evidence
         )
@@ -362,23 +414,23 @@ class RecommendationEngine:
     def _create_configuration_update(self, recommendations: List[Recommendation]) -> ConfigurationUpdate:
         """Create complete configuration update from recommendations."""
         
-        # Extract recommendations by type
-        individual_read_registers = list(self.current_config['individual_read_registers'])
+        # Extract recommendations by type; the lists are kept sorted via
+        # insort, with companion sets giving O(1) duplicate checks
+        individual_read_registers = sorted(self.current_config['individual_read_registers'])
         register_timeouts = dict(self.current_config['register_timeouts'])
-        low_priority_registers = list(self.current_config['low_priority_registers'])
-        
+        low_priority_registers = sorted(self.current_config['low_priority_registers'])
+        ir_seen = set(individual_read_registers)
+        lp_seen = set(low_priority_registers)
+
         for rec in recommendations:
-            if rec.type == "individual_read" and rec.register not in individual_read_registers:
-                individual_read_registers.append(rec.register)
+            if rec.type == "individual_read" and rec.register not in ir_seen:
+                insort(individual_read_registers, rec.register)
+                ir_seen.add(rec.register)
             elif rec.type == "timeout_adjustment":
-                new_timeout = float(rec.recommended_value.replace('s', ''))
-                register_timeouts[rec.register] = new_timeout
-            elif rec.type == "low_priority" and rec.register not in low_priority_registers:
-                low_priority_registers.append(rec.register)
-        
-        # Sort lists
-        individual_read_registers.sort()
-        low_priority_registers.sort()
+                register_timeouts[rec.register] = rec.recommended_numeric
+            elif rec.type == "low_priority" and rec.register not in lp_seen:
+                insort(low_priority_registers, rec.register)
+                lp_seen.add(rec.register)
         
         # Generate summary
         summary = self._generate_summary(recommendations, individual_read_registers, register_timeouts, low_priority_registers)
@@ -404,17 +456,20 @@ class RecommendationEngine:
         """Generate summary of configuration changes."""
         changes = []
         
-        new_individual_reads = [r for r in individual_reads if r not in self.current_config['individual_read_registers']]
+        new_individual_reads = [r for r in individual_reads if r not in self._individual_read_set]
         if new_individual_reads:
             changes.append(f"Add {len(new_individual_reads)} registers to individual reads: {new_individual_reads}")
-        
-        new_timeouts = {k: v for k, v in timeouts.items() 
-                       if k not in self.current_config['register_timeouts'] or 
-                       self.current_config['register_timeouts'][k] != v}
+
+        # One .get per key replaces the contains-then-index double lookup;
+        # the sentinel marks keys that are new rather than changed
+        current_timeouts = self.current_config['register_timeouts']
+        missing = object()
+        new_timeouts = {k: v for k, v in timeouts.items()
+                       if current_timeouts.get(k, missing) != v}
         if new_timeouts:
             changes.append(f"Adjust timeouts for {len(new_timeouts)} registers")
-        
-        new_low_priority = [r for r in low_priority if r not in self.current_config['low_priority_registers']]
+
+        new_low_priority = [r for r in low_priority if r not in self._low_priority_set]
         if new_low_priority:
             changes.append(f"Add {len(new_low_priority)} registers to low priority: {new_low_priority}")
         
@@ -444,42 +499,37 @@ class RecommendationEngine:
             if CREATE_BACKUP and os.path.exists(output_file):
                 backup_file = os.path.join(BACKUP_DIR, f"const_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.py")
                 os.makedirs(BACKUP_DIR, exist_ok=True)
-                with open(output_file, 'r') as src, open(backup_file, 'w') as dst:
-                    dst.write(src.read())
+                shutil.copyfile(output_file, backup_file)
                 logger.info(f"✅ Backup created: {backup_file}")
             
-            # Generate new const.py
+            # Generate new const.py: substitute the variable blocks into
+            # the fixed template and write once
+            timeout_lines = []
+            for register, timeout in sorted(config_update.register_timeouts.items()):
+                perf = self.performance_data.get(register)
+                sensor_name = perf.sensor_name if perf else f"register_{register}"
+                timeout_lines.append(f"    {register}: {timeout},  # {sensor_name}\n")
+
+            content = _CONST_TEMPLATE.substitute(
+                timestamp=config_update.timestamp,
+                individual_read_lines="".join(
+                    f"    {register},\n" for register in config_update.individual_read_registers
+                ),
+                timeout_lines="".join(timeout_lines),
+                low_priority_lines="".join(
+                    f"    {register},\n" for register in config_update.low_priority_registers
+                ),
+                summary=config_update.summary.replace('\n', '\n# '),
+                risk_assessment=config_update.risk_assessment,
+                recommendation_lines="".join(
+                    f"# {rec.type.upper()}: Register {rec.register} - {rec.reason} (Priority: {rec.priority})\n"
+                    for rec in config_update.recommendations
+                ),
+            )
+
             with open(output_file, 'w', encoding='utf-8') as f:
-                f.write("# Lambda Heat Pumps - Updated Configuration\n")
-                f.write("# Generated by Modbus Diagnostics Tool\n")
-                f.write(f"# Generated: {config_update.timestamp}\n\n")
-                
-                f.write("# Individual Read Registers\n")
-                f.write("LAMBDA_INDIVIDUAL_READ_REGISTERS = [\n")
-                for register in config_update.individual_read_registers:
-                    f.write(f"    {register},\n")
-                f.write("]\n\n")
-                
-                f.write("# Register-specific Timeouts\n")
-                f.write("LAMBDA_REGISTER_TIMEOUTS = {\n")
-                for register, timeout in sorted(config_update.register_timeouts.items()):
-                    f.write(f"    {register}: {timeout},  # {self.performance_data.get(register, {}).get('sensor_name', f'register_{register}')}\n")
-                f.write("}\n\n")
-                
-                f.write("# Low Priority Registers\n")
-                f.write("LAMBDA_LOW_PRIORITY_REGISTERS = [\n")
-                for register in config_update.low_priority_registers:
-                    f.write(f"    {register},\n")
-                f.write("]\n\n")
-                
-                f.write("# Recommendations Summary\n")
-                f.write("# " + config_update.summary.replace('\n', '\n# ') + "\n")
-                f.write("# Risk Assessment: " + config_update.risk_assessment + "\n\n")
-                
-                f.write("# Generated Recommendations:\n")
-                for rec in config_update.recommendations:
-                    f.write(f"# {rec.type.upper()}: Register {rec.register} - {rec.reason} (Priority: {rec.priority})\n")
-            
+                f.write(content)
+
             logger.info(f"✅ Generated const.py: {output_file}")
             
         except Exception as e:
@@ -514,9 +564,12 @@ class RecommendationEngine:
                 ]
             }
             
+            # Encode once, write once: json.dump would stream many tiny
+            # writes through the encoder instead
+            encoded = json.dumps(data, indent=2, ensure_ascii=False, default=str)
             with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            
+                f.write(encoded)
+
             logger.info(f"✅ Recommendations exported to JSON: {output_file}")
             
         except Exception as e:
@@ -3,6 +3,8 @@
 Simple Modbus connection test to isolate the issue
 """
 
+import asyncio
+import atexit
 import sys
 import logging
 from pymodbus.client.sync import ModbusTcpClient
@@ -12,45 +14,100 @@ from pymodbus.exceptions import ModbusException, ConnectionException
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_modbus_connection():
+# Function code 0x03 allows ~125 registers per request; stay under that
+MAX_REGISTERS_PER_READ = 120
+
+# Connected clients kept alive across calls, keyed by (host, port), so
+# repeated probes skip the TCP handshake
+_CLIENT_POOL = {}
+
+def _get_client(host, port, timeout=5.0):
+    """Return a connected pooled client, or None if connecting fails."""
+    client = _CLIENT_POOL.get((host, port))
+    if client is not None and client.is_socket_open():
+        return client
+
+    client = ModbusTcpClient(host=host, port=port, timeout=timeout)
+    if not client.connect():
+        return None
+    _CLIENT_POOL[(host, port)] = client
+    return client
+
+def _close_pool():
+    """Close all pooled connections."""
+    for client in _CLIENT_POOL.values():
+        client.close()
+    _CLIENT_POOL.clear()
+
+atexit.register(_close_pool)
+
+def _plan_runs(addresses, max_count=MAX_REGISTERS_PER_READ):
+    """Group register addresses into contiguous (start, count) runs.
+
+    Addresses are sorted and deduplicated first; each run is capped at
+    max_count so it fits into a single read request.
+    """
+    runs = []
+    addrs = sorted(set(addresses))
+    if not addrs:
+        return runs
+
+    start = prev = addrs[0]
+    for addr in addrs[1:]:
+        if addr == prev + 1 and addr - start < max_count:
+            prev = addr
+        else:
+            runs.append((start, prev - start + 1))
+            start = prev = addr
+    runs.append((start, prev - start + 1))
+    return runs
+
+async def test_modbus_connection():
     """Test basic Modbus connection."""
     try:
         logger.info("🔧 Testing Modbus connection...")
-        
+
         # Test connection to secondary host (Python simulator)
         host = "192.168.178.57"
         port = 5020
-        register = 1000
-        
+        registers = [1000, 1001, 1002, 1003, 1004]
+
         logger.info(f"📡 Connecting to {host}:{port}")
-        
-        client = ModbusTcpClient(host=host, port=port, timeout=5.0)
-        
-        if not client.connect():
+
+        # The pinned pymodbus client blocks on the socket, so connect and
+        # read run on worker threads; gathering several of these lets
+        # multiple probes overlap their round trips
+        client = await asyncio.to_thread(_get_client, host, port)
+        if client is None:
             logger.error(f"❌ Failed to connect to {host}:{port}")
             return False
-        
+
         logger.info("✅ Connected successfully")
-        
-        # Try to read a register
-        logger.info(f"📖 Reading register {register}")
-        result = client.read_holding_registers(address=register, count=1)
-        
-        if result.isError():
-            logger.error(f"❌ Modbus error: {result}")
-            return False
-        
-        value = result.registers[0] if result.registers else None
-        logger.info(f"✅ Register {register} = {value}")
-        
-        client.close()
+
+        # Read the registers as contiguous batches: one round trip per
+        # run instead of one per register
+        runs = _plan_runs(registers)
+        logger.info(f"📖 Reading {len(registers)} registers in {len(runs)} request(s)")
+        values = {}
+        for start, count in runs:
+            result = await asyncio.to_thread(client.read_holding_registers, start, count)
+            if result.isError():
+                logger.error(f"❌ Modbus error reading {start}..{start + count - 1}: {result}")
+                return False
+            for offset, value in enumerate(result.registers):
+                values[start + offset] = value
+
+        for register in registers:
+            logger.info(f"✅ Register {register} = {values.get(register)}")
+
+        # The pooled client stays open for follow-up calls; atexit closes it
         logger.info("✅ Test completed successfully")
         return True
-        
+
     except Exception as e:
         logger.error(f"❌ Test failed: {e}")
         return False
 
 if __name__ == "__main__":
-    success = test_modbus_connection()
+    success = asyncio.run(test_modbus_connection())
     sys.exit(0 if success else 1)
@@ -4,199 +4,287 @@ Test script for different host access modes
 Demonstrates how the secondary host is accessed in different modes
 """
 
+import argparse
+import socket
+import sys
 import time
 import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from pymodbus.exceptions import ConnectionException, ModbusIOException
 from const import (
     HOST_ACCESS_MODE, get_host_access_mode, get_host_status,
     switch_hosts, USE_SECONDARY_AS_PRIMARY
 )
 from modbus_monitor import ModbusMonitor, MonitorConfig
+from modbus_pipeline import PipelinedModbusClient
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
-def test_host_modes():
-    """Test all host access modes."""
-    
-    print("🔧 HOST ACCESS MODE TESTER")
-    print("=" * 50)
-    
+# Buffered output: lines are collected per section and written with a
+# single syscall instead of one write() per print (matters when piped)
+_out = []
+
+def _flush():
+    """Write all buffered lines at once and reset the buffer."""
+    if _out:
+        sys.stdout.write('\n'.join(_out) + '\n')
+        _out.clear()
+
+def test_pipelined_reads(registers=(1000, 1001, 1002, 1003, 1004)):
+    """Read several registers with all requests in flight at once.
+
+    Uses the PipelinedModbusClient against the active primary host:
+    every request is written before the first reply is collected, so the
+    batch costs roughly one round trip instead of one per register.
+    """
+    p = _out.append
+    p(f"\n🚄 Pipelined reads (single connection, requests in flight together):")
+
+    primary = get_host_status()['active_primary']
+    try:
+        with PipelinedModbusClient(primary['host'], primary['port']) as client:
+            start_ns = time.perf_counter_ns()
+            futures = [(reg, client.read_holding_registers(reg)) for reg in registers]
+            for reg, future in futures:
+                try:
+                    values = future.result(timeout=client.timeout)
+                    p(f"   Register {reg}: ✅ Value: {values[0]}")
+                except (IOError, ConnectionError, FutureTimeoutError) as e:
+                    p(f"   Register {reg}: ❌ Error: {e}")
+            elapsed_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            p(f"   {len(registers)} reads completed in {elapsed_ms:.1f}ms")
+    except ConnectionError as e:
+        p(f"   ❌ {e}")
+    _flush()
+
+def test_host_modes(pace: float = 0.0):
+    """Test all host access modes.
+
+    pace optionally inserts a delay (seconds) between requests; Modbus
+    TCP needs no inter-frame gap, so the default is no pacing.
+    """
+
+    p = _out.append
+    p("🔧 HOST ACCESS MODE TESTER")
+    p("=" * 50)
+
     # Show current configuration
     host_status = get_host_status()
     access_mode_info = get_host_access_mode()
-    
-    print(f"\n📋 Current Configuration:")
-    print(f"   Host Switch: {'ENABLED' if host_status['switch_enabled'] else 'DISABLED'}")
-    print(f"   Access Mode: {HOST_ACCESS_MODE}")
-    print(f"   Description: {access_mode_info['description']}")
-    print(f"   Behavior: {access_mode_info['behavior']}")
-    
-    print(f"\n🌐 Active Hosts:")
-    print(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']} "
-          f"(original: {host_status['active_primary']['original_role']})")
-    print(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']} "
-          f"(original: {host_status['active_secondary']['original_role']})")
-    
-    print(f"\n📊 Available Modes:")
+
+    p(f"\n📋 Current Configuration:")
+    p(f"   Host Switch: {'ENABLED' if host_status['switch_enabled'] else 'DISABLED'}")
+    p(f"   Access Mode: {HOST_ACCESS_MODE}")
+    p(f"   Description: {access_mode_info['description']}")
+    p(f"   Behavior: {access_mode_info['behavior']}")
+
+    p(f"\n🌐 Active Hosts:")
+    p(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']} "
+      f"(original: {host_status['active_primary']['original_role']})")
+    p(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']} "
+      f"(original: {host_status['active_secondary']['original_role']})")
+
+    p(f"\n📊 Available Modes:")
     for mode in access_mode_info['available_modes']:
-        print(f"   - {mode}")
-    
-    print(f"\n🧪 Testing Access Modes:")
-    print("   (Note: This will attempt real Modbus connections)")
-    
-    # Test each mode
+        p(f"   - {mode}")
+
+    p(f"\n🧪 Testing Access Modes:")
+    p("   (Note: This will attempt real Modbus connections)")
+    _flush()
+
+    # Test each mode on one shared monitor: the mode is switched in
+    # place instead of rebuilding monitor and connections per mode
     modes_to_test = ['fallback', 'alternating', 'both', 'primary_only', 'secondary_only']
-    
-    for mode in modes_to_test:
-        print(f"\n--- Testing Mode: {mode} ---")
-        
-        # Update the mode in const.py (this would normally be done by changing the file)
-        print(f"   Mode: {mode}")
-        print(f"   Description: {access_mode_info['description']}")
-        
-        # Create monitor with this mode
-        config = MonitorConfig()
-        monitor = ModbusMonitor(config)
-        
-        # Run a few test requests
-        print(f"   Running 3 test requests...")
-        for i in range(3):
-            try:
-                result = monitor._perform_modbus_read()
-                if result.success:
-                    print(f"     Request {i+1}: ✅ {result.host}:{result.port} - "
+
+    config = MonitorConfig()
+    monitor = ModbusMonitor(config)
+    try:
+        # Cheap Modbus-level liveness check before exercising the modes
+        p(f"\n🏓 Liveness check:")
+        for host_type in ('primary', 'secondary'):
+            alive = monitor.modbus_ping(host_type)
+            p(f"   {host_type.capitalize()}: "
+              f"{'✅ Modbus responding' if alive else '❌ no Modbus response'}")
+        _flush()
+
+        # Batch read on one connection before exercising the modes
+        test_pipelined_reads()
+
+        for mode in modes_to_test:
+            p(f"\n--- Testing Mode: {mode} ---")
+
+            monitor.set_mode(mode)
+            p(f"   Mode: {mode}")
+            p(f"   Description: {access_mode_info['description']}")
+
+            # Run a few test requests. Only the expected Modbus error
+            # classes are caught; anything else is a real bug and should
+            # propagate. Consecutive failures back off exponentially so
+            # an unreachable host is not hammered in a tight loop.
+            p(f"   Running 3 test requests...")
+            consecutive_fails = 0
+            for i in range(3):
+                try:
+                    result = monitor._perform_modbus_read()
+                    if result.success:
+                        consecutive_fails = 0
+                        p(f"     Request {i+1}: ✅ {result.host}:{result.port} - "
                           f"{result.response_time:.1f}ms - Value: {result.value}")
-                else:
-                    print(f"     Request {i+1}: ❌ {result.host}:{result.port} - "
+                    else:
+                        consecutive_fails += 1
+                        p(f"     Request {i+1}: ❌ {result.host}:{result.port} - "
                           f"{result.error_type}: {result.error_message}")
-            except Exception as e:
-                print(f"     Request {i+1}: ❌ Error: {e}")
-            
-            time.sleep(1)  # Small delay between requests
-        
-        # Show statistics
-        stats = monitor.get_statistics()
-        print(f"   Statistics:")
-        print(f"     Total Requests: {stats['total_requests']}")
-        print(f"     Success Rate: {stats['success_rate']:.1f}%")
-        print(f"     Fallback Switches: {stats['fallback_switches']}")
-        print(f"     Alternating Switches: {stats['alternating_switches']}")
-        print(f"     Both Host Tests: {stats['both_host_tests']}")
-        
-        time.sleep(2)  # Delay between modes
+                except (ConnectionException, ModbusIOException, socket.timeout) as e:
+                    consecutive_fails += 1
+                    p(f"     Request {i+1}: ❌ Error: {e}")
+
+                if consecutive_fails:
+                    sleep_ms = min(1000, 50 * 2 ** consecutive_fails)
+                    time.sleep(sleep_ms / 1000)
+                elif pace:
+                    time.sleep(pace)
+
+            # Show statistics
+            stats = monitor.get_statistics()
+            p(f"   Statistics:")
+            p(f"     Total Requests: {stats['total_requests']}")
+            p(f"     Success Rate: {stats['success_rate']:.1f}%")
+            p(f"     Fallback Switches: {stats['fallback_switches']}")
+            p(f"     Alternating Switches: {stats['alternating_switches']}")
+            p(f"     Both Host Tests: {stats['both_host_tests']}")
+            _flush()
+    finally:
+        monitor.close()
 
 def demonstrate_host_switch():
     """Demonstrate host switching functionality."""
     
-    print(f"\n🔄 HOST SWITCH DEMONSTRATION")
-    print("=" * 50)
-    
+    p = _out.append
+    p(f"\n🔄 HOST SWITCH DEMONSTRATION")
+    p("=" * 50)
+
     # Show original configuration
-    print(f"\n📋 Original Configuration:")
+    p(f"\n📋 Original Configuration:")
     host_status = get_host_status()
-    print(f"   Switch Enabled: {host_status['switch_enabled']}")
-    print(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']}")
-    print(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']}")
-    
+    p(f"   Switch Enabled: {host_status['switch_enabled']}")
+    p(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']}")
+    p(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']}")
+
     # Switch hosts
-    print(f"\n🔄 Switching hosts...")
+    p(f"\n🔄 Switching hosts...")
     new_switch_state = switch_hosts()
-    print(f"   New switch state: {new_switch_state}")
-    
+    p(f"   New switch state: {new_switch_state}")
+
     # Show new configuration
     host_status = get_host_status()
-    print(f"\n📋 New Configuration:")
-    print(f"   Switch Enabled: {host_status['switch_enabled']}")
-    print(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']} "
-          f"(was {host_status['active_primary']['original_role']})")
-    print(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']} "
-          f"(was {host_status['active_secondary']['original_role']})")
-    
+    p(f"\n📋 New Configuration:")
+    p(f"   Switch Enabled: {host_status['switch_enabled']}")
+    p(f"   Primary: {host_status['active_primary']['host']}:{host_status['active_primary']['port']} "
+      f"(was {host_status['active_primary']['original_role']})")
+    p(f"   Secondary: {host_status['active_secondary']['host']}:{host_status['active_secondary']['port']} "
+      f"(was {host_status['active_secondary']['original_role']})")
+
     # Switch back
-    print(f"\n🔄 Switching back...")
+    p(f"\n🔄 Switching back...")
     switch_hosts()
-    print(f"   Switch state: {USE_SECONDARY_AS_PRIMARY}")
+    p(f"   Switch state: {USE_SECONDARY_AS_PRIMARY}")
+    _flush()
+
+# Static mode documentation, built once at import
+_MODE_EXPLANATIONS = {
+    'fallback': {
+        'title': 'Fallback Mode (Default)',
+        'description': 'Secondary wird nur bei Primary-Fehlern verwendet',
+        'when_secondary_used': 'Nur wenn Primary Host nicht erreichbar ist oder Timeout hat',
+        'use_case': 'Produktionsumgebung - minimale Belastung des Secondary Hosts',
+        'pros': ['Minimale Netzwerk-Belastung', 'Einfache Konfiguration', 'Zuverlässiger Fallback'],
+        'cons': ['Secondary wird selten getestet', 'Langsame Erkennung von Secondary-Problemen']
+    },
+    'alternating': {
+        'title': 'Alternating Mode',
+        'description': 'Wechselt zwischen Primary und Secondary ab',
+        'when_secondary_used': 'Bei jedem zweiten Request',
+        'use_case': 'Load Balancing oder regelmäßige Tests beider Hosts',
+        'pros': ['Gleichmäßige Belastung', 'Regelmäßige Tests beider Hosts', 'Bessere Fehlererkennung'],
+        'cons': ['Höhere Netzwerk-Belastung', 'Komplexere Logik']
+    },
+    'both': {
+        'title': 'Both Hosts Mode',
+        'description': 'Beide Hosts werden bei jedem Request getestet',
+        'when_secondary_used': 'Bei jedem Request parallel zum Primary',
+        'use_case': 'Umfassende Diagnose und Performance-Vergleich',
+        'pros': ['Vollständige Diagnose', 'Performance-Vergleich', 'Schnelle Fehlererkennung'],
+        'cons': ['Doppelte Netzwerk-Belastung', 'Längere Request-Zeit']
+    },
+    'primary_only': {
+        'title': 'Primary Only Mode',
+        'description': 'Nur Primary Host wird verwendet',
+        'when_secondary_used': 'Nie',
+        'use_case': 'Wenn Secondary Host nicht verfügbar ist',
+        'pros': ['Minimale Belastung', 'Einfache Konfiguration'],
+        'cons': ['Kein Fallback', 'Keine Redundanz']
+    },
+    'secondary_only': {
+        'title': 'Secondary Only Mode',
+        'description': 'Nur Secondary Host wird verwendet',
+        'when_secondary_used': 'Bei jedem Request',
+        'use_case': 'Testing des Secondary Hosts oder wenn Primary nicht verfügbar',
+        'pros': ['Testet Secondary Host', 'Einfache Konfiguration'],
+        'cons': ['Kein Fallback', 'Keine Redundanz']
+    }
+}
 
 def show_mode_explanations():
     """Show detailed explanations of each mode."""
-    
-    print(f"\n📖 MODE EXPLANATIONS")
-    print("=" * 50)
-    
-    explanations = {
-        'fallback': {
-            'title': 'Fallback Mode (Default)',
-            'description': 'Secondary wird nur bei Primary-Fehlern verwendet',
-            'when_secondary_used': 'Nur wenn Primary Host nicht erreichbar ist oder Timeout hat',
-            'use_case': 'Produktionsumgebung - minimale Belastung des Secondary Hosts',
-            'pros': ['Minimale Netzwerk-Belastung', 'Einfache Konfiguration', 'Zuverlässiger Fallback'],
-            'cons': ['Secondary wird selten getestet', 'Langsame Erkennung von Secondary-Problemen']
-        },
-        'alternating': {
-            'title': 'Alternating Mode',
-            'description': 'Wechselt zwischen Primary und Secondary ab',
-            'when_secondary_used': 'Bei jedem zweiten Request',
-            'use_case': 'Load Balancing oder regelmäßige Tests beider Hosts',
-            'pros': ['Gleichmäßige Belastung', 'Regelmäßige Tests beider Hosts', 'Bessere Fehlererkennung'],
-            'cons': ['Höhere Netzwerk-Belastung', 'Komplexere Logik']
-        },
-        'both': {
-            'title': 'Both Hosts Mode',
-            'description': 'Beide Hosts werden bei jedem Request getestet',
-            'when_secondary_used': 'Bei jedem Request parallel zum Primary',
-            'use_case': 'Umfassende Diagnose und Performance-Vergleich',
-            'pros': ['Vollständige Diagnose', 'Performance-Vergleich', 'Schnelle Fehlererkennung'],
-            'cons': ['Doppelte Netzwerk-Belastung', 'Längere Request-Zeit']
-        },
-        'primary_only': {
-            'title': 'Primary Only Mode',
-            'description': 'Nur Primary Host wird verwendet',
-            'when_secondary_used': 'Nie',
-            'use_case': 'Wenn Secondary Host nicht verfügbar ist',
-            'pros': ['Minimale Belastung', 'Einfache Konfiguration'],
-            'cons': ['Kein Fallback', 'Keine Redundanz']
-        },
-        'secondary_only': {
-            'title': 'Secondary Only Mode',
-            'description': 'Nur Secondary Host wird verwendet',
-            'when_secondary_used': 'Bei jedem Request',
-            'use_case': 'Testing des Secondary Hosts oder wenn Primary nicht verfügbar',
-            'pros': ['Testet Secondary Host', 'Einfache Konfiguration'],
-            'cons': ['Kein Fallback', 'Keine Redundanz']
-        }
-    }
-    
-    for mode, info in explanations.items():
-        print(f"\n🔧 {info['title']}")
-        print(f"   Description: {info['description']}")
-        print(f"   When Secondary Used: {info['when_secondary_used']}")
-        print(f"   Use Case: {info['use_case']}")
-        print(f"   Pros: {', '.join(info['pros'])}")
-        print(f"   Cons: {', '.join(info['cons'])}")
+
+    p = _out.append
+    p(f"\n📖 MODE EXPLANATIONS")
+    p("=" * 50)
+
+    for mode, info in _MODE_EXPLANATIONS.items():
+        p(f"\n🔧 {info['title']}")
+        p(f"   Description: {info['description']}")
+        p(f"   When Secondary Used: {info['when_secondary_used']}")
+        p(f"   Use Case: {info['use_case']}")
+        p(f"   Pros: {', '.join(info['pros'])}")
+        p(f"   Cons: {', '.join(info['cons'])}")
+    _flush()
 
 def main():
     """Main function."""
+    parser = argparse.ArgumentParser(description="Modbus host access mode tester")
+    parser.add_argument('--pace-ms', type=int, default=0,
+                        help="Delay between test requests in milliseconds (default: 0)")
+    parser.add_argument('--real-connections', action='store_true',
+                        help="Run the access mode tests against the configured hosts without prompting")
+    args = parser.parse_args()
+
     print("🚀 Modbus Host Access Mode Tester")
     print("=" * 60)
-    
+
     try:
         # Show mode explanations
         show_mode_explanations()
-        
+
         # Demonstrate host switching
         demonstrate_host_switch()
-        
-        # Ask user if they want to test modes
-        print(f"\n❓ Do you want to test the access modes with real Modbus connections?")
-        print(f"   This will attempt to connect to your configured hosts.")
-        response = input("   Continue? (y/N): ").strip().lower()
-        
-        if response in ['y', 'yes']:
-            test_host_modes()
+
+        # Run connection tests when requested via flag, otherwise ask
+        if args.real_connections:
+            run_tests = True
+        else:
+            print(f"\n❓ Do you want to test the access modes with real Modbus connections?")
+            print(f"   This will attempt to connect to your configured hosts.")
+            response = input("   Continue? (y/N): ").strip().lower()
+            run_tests = response in ['y', 'yes']
+
+        if run_tests:
+            test_host_modes(pace=args.pace_ms / 1000)
         else:
             print("   Skipping real connection tests.")
-        
+
         print(f"\n✅ Test completed!")
         
     except KeyboardInterrupt:
@@ -4,23 +4,69 @@ Test script to verify all requirements are properly installed and functional
 """
 
 import sys
+import argparse
 import importlib
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 
-def test_import(module_name, description=""):
-    """Test if a module can be imported."""
+def test_import(module_name, description="", deep=False):
+    """Check that a module is available; returns (success, module, description, error).
+
+    By default this only locates the module: already-imported modules are
+    found in sys.modules, everything else via importlib.util.find_spec,
+    which does not execute the module's top-level code. With deep=True
+    the module is actually imported, catching broken installs that have
+    a spec but fail at import time.
+    """
+    if deep:
+        try:
+            importlib.import_module(module_name)
+            return True, module_name, description, None
+        except ImportError as e:
+            return False, module_name, description, e
+
+    if module_name in sys.modules:
+        return True, module_name, description, None
     try:
-        importlib.import_module(module_name)
-        print(f"✅ {module_name} - {description}")
-        return True
+        if importlib.util.find_spec(module_name) is not None:
+            return True, module_name, description, None
+        error = ModuleNotFoundError(f"No module named {module_name!r}")
     except ImportError as e:
-        print(f"❌ {module_name} - {description} - Error: {e}")
-        return False
+        # find_spec imports parent packages; a missing parent lands here
+        error = e
+    return False, module_name, description, error
+
+def run_imports(tests, deep=False):
+    """Check the given modules in parallel and return their results in order.
+
+    Checks are independent, so a cold filesystem cache pays max(t_i)
+    instead of the sum. tkinter is excluded here and must be imported on
+    the main thread.
+    """
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        return list(executor.map(lambda t: test_import(*t, deep=deep), tests))
+
+def print_results(results):
+    """Print import results and return the success count."""
+    success = 0
+    for ok, module, desc, error in results:
+        if ok:
+            print(f"✅ {module} - {desc}")
+            success += 1
+        else:
+            print(f"❌ {module} - {desc} - Error: {error}")
+    return success
 
 def main():
     """Test all required modules."""
+    parser = argparse.ArgumentParser(description="Verify tool requirements")
+    parser.add_argument('--deep', action='store_true',
+                        help="Actually import each module instead of only locating it")
+    args = parser.parse_args()
+
     print("🔍 Testing Modbus Diagnostics Tool Requirements")
     print("=" * 50)
-    
+
     # Core dependencies
     tests = [
         ("pymodbus", "Modbus communication library"),
@@ -29,8 +75,9 @@ def main():
         ("serial", "Serial communication (pymodbus dependency)"),
         ("six", "Python 2/3 compatibility (pymodbus dependency)"),
     ]
-    
-    # Standard library modules
+
+    # Standard library modules (tkinter handled separately: it is not
+    # thread-safe to initialize off the main thread)
     stdlib_tests = [
         ("sqlite3", "Database operations"),
         ("threading", "Concurrent operations"),
@@ -43,29 +90,26 @@ def main():
         ("time", "Time operations"),
         ("random", "Random number generation"),
         ("argparse", "Command line argument parsing"),
-        ("tkinter", "GUI framework"),
         ("dataclasses", "Data classes (Python 3.7+)"),
         ("typing", "Type hints"),
         ("collections", "Advanced data collections"),
         ("concurrent.futures", "Parallel processing"),
     ]
-    
+
     print("\n📦 Core Dependencies:")
-    core_success = 0
-    for module, desc in tests:
-        if test_import(module, desc):
-            core_success += 1
-    
+    core_success = print_results(run_imports(tests, deep=args.deep))
+
     print("\n📚 Standard Library Modules:")
-    stdlib_success = 0
-    for module, desc in stdlib_tests:
-        if test_import(module, desc):
-            stdlib_success += 1
-    
+    stdlib_results = run_imports(stdlib_tests, deep=args.deep)
+    # tkinter last, on the main thread
+    stdlib_results.append(test_import("tkinter", "GUI framework", deep=args.deep))
+    stdlib_success = print_results(stdlib_results)
+    stdlib_total = len(stdlib_tests) + 1
+
     print("\n" + "=" * 50)
-    print(f"📊 Results: {core_success}/{len(tests)} core dependencies, {stdlib_success}/{len(stdlib_tests)} stdlib modules")
-    
-    if core_success == len(tests) and stdlib_success == len(stdlib_tests):
+    print(f"📊 Results: {core_success}/{len(tests)} core dependencies, {stdlib_success}/{stdlib_total} stdlib modules")
+
+    if core_success == len(tests) and stdlib_success == stdlib_total:
         print("🎉 All requirements are satisfied!")
         return 0
     else: